@@ -0,0 +1,56 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS `guild_configs` (
+    `guild_id` INT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    `leaders_role` INT,
+    `urls` BOOL
+) CHARACTER SET utf8mb4 COMMENT='Guild configuration model';
+CREATE TABLE IF NOT EXISTS `monitor_checkpoints` (
+    `name` VARCHAR(30) NOT NULL  PRIMARY KEY,
+    `cursor` BIGINT,
+    `sweep_started` DATETIME(6)
+) CHARACTER SET utf8mb4 COMMENT='Progress of a periodic sweep over the guild configurations';
+CREATE TABLE IF NOT EXISTS `tribe_categories` (
+    `id` INT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    `name` VARCHAR(30) NOT NULL,
+    `guild_config_id` INT NOT NULL,
+    CONSTRAINT `fk_tribe_ca_guild_co_b0d227d1` FOREIGN KEY (`guild_config_id`) REFERENCES `guild_configs` (`guild_id`) ON DELETE CASCADE
+) CHARACTER SET utf8mb4 COMMENT='A gategory a tribe can be a part of.';
+CREATE TABLE IF NOT EXISTS `tribes` (
+    `id` INT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    `created` DATETIME(6) NOT NULL  DEFAULT CURRENT_TIMESTAMP(6),
+    `name` VARCHAR(30) NOT NULL,
+    `leader` INT NOT NULL,
+    `manager` INT,
+    `banner` JSON NOT NULL,
+    `color` INT NOT NULL  DEFAULT 16711680,
+    `category_id` INT,
+    `guild_config_id` INT NOT NULL,
+    CONSTRAINT `fk_tribes_tribe_ca_400c3e7f` FOREIGN KEY (`category_id`) REFERENCES `tribe_categories` (`id`) ON DELETE CASCADE,
+    CONSTRAINT `fk_tribes_guild_co_2c302fad` FOREIGN KEY (`guild_config_id`) REFERENCES `guild_configs` (`guild_id`) ON DELETE CASCADE
+) CHARACTER SET utf8mb4;
+CREATE TABLE IF NOT EXISTS `log_entries` (
+    `id` INT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    `created` DATETIME(6) NOT NULL  DEFAULT CURRENT_TIMESTAMP(6),
+    `text` LONGTEXT NOT NULL,
+    `tribe_id` INT NOT NULL,
+    CONSTRAINT `fk_log_entr_tribes_68329bd9` FOREIGN KEY (`tribe_id`) REFERENCES `tribes` (`id`) ON DELETE CASCADE
+) CHARACTER SET utf8mb4 COMMENT='Log entry model for tribes.';
+CREATE TABLE IF NOT EXISTS `tribe_join_applications` (
+    `id` INT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    `created` DATETIME(6) NOT NULL  DEFAULT CURRENT_TIMESTAMP(6),
+    `applicant` INT NOT NULL,
+    `tribe_id` INT NOT NULL,
+    CONSTRAINT `fk_tribe_jo_tribes_4011a0c2` FOREIGN KEY (`tribe_id`) REFERENCES `tribes` (`id`) ON DELETE CASCADE
+) CHARACTER SET utf8mb4;
+CREATE TABLE IF NOT EXISTS `tribemember` (
+    `id` INT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    `member_id` INT NOT NULL,
+    `tribe_id` INT NOT NULL,
+    CONSTRAINT `fk_tribemem_tribes_2f27177b` FOREIGN KEY (`tribe_id`) REFERENCES `tribes` (`id`) ON DELETE CASCADE
+) CHARACTER SET utf8mb4;
+CREATE TABLE IF NOT EXISTS `aerich` (
+    `id` INT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    `version` VARCHAR(255) NOT NULL,
+    `app` VARCHAR(100) NOT NULL,
+    `content` JSON NOT NULL
+) CHARACTER SET utf8mb4;
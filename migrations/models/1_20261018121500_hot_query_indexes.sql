@@ -0,0 +1,25 @@
+-- upgrade --
+ALTER TABLE `tribe_categories` ADD `name_key` VARCHAR(30) NOT NULL;
+UPDATE `tribe_categories` SET `name_key` = LOWER(TRIM(`name`));
+ALTER TABLE `tribe_categories` ADD UNIQUE INDEX `uid_tribe_categ_guild_c_abae5c` (`guild_config_id`, `name_key`);
+ALTER TABLE `tribes` ADD INDEX `idx_tribes_leader_cbbec8` (`leader`);
+ALTER TABLE `tribes` ADD INDEX `idx_tribes_manager_1dc1a7` (`manager`);
+ALTER TABLE `tribes` ADD INDEX `idx_tribes_guild_c_9affc6` (`guild_config_id`, `name`);
+DELETE `duplicate` FROM `tribemember` `duplicate` JOIN `tribemember` `original` ON `duplicate`.`tribe_id` = `original`.`tribe_id` AND `duplicate`.`member_id` = `original`.`member_id` AND `duplicate`.`id` > `original`.`id`;
+ALTER TABLE `tribemember` ADD UNIQUE INDEX `uid_tribemember_tribe_i_e25939` (`tribe_id`, `member_id`);
+ALTER TABLE `tribemember` ADD INDEX `idx_tribemember_member__a75168` (`member_id`);
+DELETE `duplicate` FROM `tribe_join_applications` `duplicate` JOIN `tribe_join_applications` `original` ON `duplicate`.`tribe_id` = `original`.`tribe_id` AND `duplicate`.`applicant` = `original`.`applicant` AND `duplicate`.`id` > `original`.`id`;
+ALTER TABLE `tribe_join_applications` ADD UNIQUE INDEX `uid_tribe_join__tribe_i_45c2bf` (`tribe_id`, `applicant`);
+-- downgrade --
+ALTER TABLE `tribe_join_applications` ADD INDEX `fk_tribe_jo_tribes_4011a0c2` (`tribe_id`);
+ALTER TABLE `tribe_join_applications` DROP INDEX `uid_tribe_join__tribe_i_45c2bf`;
+ALTER TABLE `tribemember` DROP INDEX `idx_tribemember_member__a75168`;
+ALTER TABLE `tribemember` ADD INDEX `fk_tribemem_tribes_2f27177b` (`tribe_id`);
+ALTER TABLE `tribemember` DROP INDEX `uid_tribemember_tribe_i_e25939`;
+ALTER TABLE `tribes` ADD INDEX `fk_tribes_guild_co_2c302fad` (`guild_config_id`);
+ALTER TABLE `tribes` DROP INDEX `idx_tribes_guild_c_9affc6`;
+ALTER TABLE `tribes` DROP INDEX `idx_tribes_manager_1dc1a7`;
+ALTER TABLE `tribes` DROP INDEX `idx_tribes_leader_cbbec8`;
+ALTER TABLE `tribe_categories` ADD INDEX `fk_tribe_ca_guild_co_b0d227d1` (`guild_config_id`);
+ALTER TABLE `tribe_categories` DROP INDEX `uid_tribe_categ_guild_c_abae5c`;
+ALTER TABLE `tribe_categories` DROP COLUMN `name_key`;
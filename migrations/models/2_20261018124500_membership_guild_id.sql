@@ -0,0 +1,14 @@
+-- upgrade --
+ALTER TABLE `tribemember` ADD `guild_id` INT NOT NULL;
+UPDATE `tribemember` JOIN `tribes` ON `tribes`.`id` = `tribemember`.`tribe_id` SET `tribemember`.`guild_id` = `tribes`.`guild_config_id`;
+ALTER TABLE `tribemember` DROP INDEX `idx_tribemember_member__a75168`;
+ALTER TABLE `tribemember` ADD INDEX `idx_tribemember_guild_i_7d81bb` (`guild_id`, `member_id`);
+ALTER TABLE `tribe_join_applications` ADD `guild_id` INT NOT NULL;
+UPDATE `tribe_join_applications` JOIN `tribes` ON `tribes`.`id` = `tribe_join_applications`.`tribe_id` SET `tribe_join_applications`.`guild_id` = `tribes`.`guild_config_id`;
+ALTER TABLE `tribe_join_applications` ADD INDEX `idx_tribe_join__guild_i_514099` (`guild_id`, `applicant`);
+-- downgrade --
+ALTER TABLE `tribe_join_applications` DROP INDEX `idx_tribe_join__guild_i_514099`;
+ALTER TABLE `tribe_join_applications` DROP COLUMN `guild_id`;
+ALTER TABLE `tribemember` DROP INDEX `idx_tribemember_guild_i_7d81bb`;
+ALTER TABLE `tribemember` ADD INDEX `idx_tribemember_member__a75168` (`member_id`);
+ALTER TABLE `tribemember` DROP COLUMN `guild_id`;
@@ -0,0 +1,25 @@
+-- upgrade --
+CREATE TABLE IF NOT EXISTS `tribe_banners` (
+    `id` INT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    `description` LONGTEXT NOT NULL,
+    `image` LONGTEXT NOT NULL,
+    `tribe_id` INT NOT NULL UNIQUE,
+    CONSTRAINT `fk_tribe_ba_tribes_b2eb61ca` FOREIGN KEY (`tribe_id`) REFERENCES `tribes` (`id`) ON DELETE CASCADE
+) CHARACTER SET utf8mb4 COMMENT='Banner of a tribe, kept apart from the tribe so loading tribes doesn\'t load banners.';
+INSERT INTO `tribe_banners` (`tribe_id`, `description`, `image`)
+    SELECT `id`,
+           COALESCE(JSON_UNQUOTE(JSON_EXTRACT(`banner`, '$.description')), ''),
+           COALESCE(JSON_UNQUOTE(JSON_EXTRACT(`banner`, '$.image')), '')
+    FROM `tribes`
+    WHERE COALESCE(JSON_UNQUOTE(JSON_EXTRACT(`banner`, '$.description')), '') != ''
+       OR COALESCE(JSON_UNQUOTE(JSON_EXTRACT(`banner`, '$.image')), '') != '';
+ALTER TABLE `tribes` DROP COLUMN `banner`;
+-- downgrade --
+ALTER TABLE `tribes` ADD `banner` JSON;
+UPDATE `tribes` LEFT JOIN `tribe_banners` ON `tribe_banners`.`tribe_id` = `tribes`.`id`
+    SET `tribes`.`banner` = JSON_OBJECT(
+        'description', COALESCE(`tribe_banners`.`description`, ''),
+        'image', COALESCE(`tribe_banners`.`image`, '')
+    );
+ALTER TABLE `tribes` MODIFY `banner` JSON NOT NULL;
+DROP TABLE IF EXISTS `tribe_banners`;
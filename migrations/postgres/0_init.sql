@@ -0,0 +1,48 @@
+-- schema created by the versions before the migrations, for reference
+CREATE TABLE IF NOT EXISTS "guild_configs" (
+    "guild_id" SERIAL NOT NULL PRIMARY KEY,
+    "leaders_role" INT,
+    "urls" BOOL
+);
+COMMENT ON TABLE "guild_configs" IS 'Guild configuration model';
+CREATE TABLE IF NOT EXISTS "monitor_checkpoints" (
+    "name" VARCHAR(30) NOT NULL  PRIMARY KEY,
+    "cursor" BIGINT,
+    "sweep_started" TIMESTAMPTZ
+);
+COMMENT ON TABLE "monitor_checkpoints" IS 'Progress of a periodic sweep over the guild configurations';
+CREATE TABLE IF NOT EXISTS "tribe_categories" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "name" VARCHAR(30) NOT NULL,
+    "guild_config_id" INT NOT NULL REFERENCES "guild_configs" ("guild_id") ON DELETE CASCADE
+);
+COMMENT ON TABLE "tribe_categories" IS 'A gategory a tribe can be a part of.';
+CREATE TABLE IF NOT EXISTS "tribes" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "created" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "name" VARCHAR(30) NOT NULL,
+    "leader" INT NOT NULL,
+    "manager" INT,
+    "banner" JSONB NOT NULL,
+    "color" INT NOT NULL  DEFAULT 16711680,
+    "category_id" INT REFERENCES "tribe_categories" ("id") ON DELETE CASCADE,
+    "guild_config_id" INT NOT NULL REFERENCES "guild_configs" ("guild_id") ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS "log_entries" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "created" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "text" TEXT NOT NULL,
+    "tribe_id" INT NOT NULL REFERENCES "tribes" ("id") ON DELETE CASCADE
+);
+COMMENT ON TABLE "log_entries" IS 'Log entry model for tribes.';
+CREATE TABLE IF NOT EXISTS "tribe_join_applications" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "created" TIMESTAMPTZ NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "applicant" INT NOT NULL,
+    "tribe_id" INT NOT NULL REFERENCES "tribes" ("id") ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS "tribemember" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "member_id" INT NOT NULL,
+    "tribe_id" INT NOT NULL REFERENCES "tribes" ("id") ON DELETE CASCADE
+);
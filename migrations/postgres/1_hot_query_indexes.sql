@@ -0,0 +1,12 @@
+ALTER TABLE "tribe_categories" ADD COLUMN "name_key" VARCHAR(30) NOT NULL DEFAULT '';
+UPDATE "tribe_categories" SET "name_key" = LOWER(TRIM("name"));
+ALTER TABLE "tribe_categories" ALTER COLUMN "name_key" DROP DEFAULT;
+ALTER TABLE "tribe_categories" ADD CONSTRAINT "uid_tribe_categ_guild_c_abae5c" UNIQUE ("guild_config_id", "name_key");
+CREATE INDEX IF NOT EXISTS "idx_tribes_leader_cbbec8" ON "tribes" ("leader");
+CREATE INDEX IF NOT EXISTS "idx_tribes_manager_1dc1a7" ON "tribes" ("manager");
+CREATE INDEX IF NOT EXISTS "idx_tribes_guild_c_9affc6" ON "tribes" ("guild_config_id", "name");
+DELETE FROM "tribemember" WHERE "id" NOT IN (SELECT MIN("id") FROM "tribemember" GROUP BY "tribe_id", "member_id");
+ALTER TABLE "tribemember" ADD CONSTRAINT "uid_tribemember_tribe_i_e25939" UNIQUE ("tribe_id", "member_id");
+CREATE INDEX IF NOT EXISTS "idx_tribemember_member__a75168" ON "tribemember" ("member_id");
+DELETE FROM "tribe_join_applications" WHERE "id" NOT IN (SELECT MIN("id") FROM "tribe_join_applications" GROUP BY "tribe_id", "applicant");
+ALTER TABLE "tribe_join_applications" ADD CONSTRAINT "uid_tribe_join__tribe_i_45c2bf" UNIQUE ("tribe_id", "applicant");
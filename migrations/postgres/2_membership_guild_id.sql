@@ -0,0 +1,9 @@
+ALTER TABLE "tribemember" ADD COLUMN "guild_id" INT NOT NULL DEFAULT 0;
+UPDATE "tribemember" SET "guild_id" = (SELECT "guild_config_id" FROM "tribes" WHERE "tribes"."id" = "tribemember"."tribe_id");
+DROP INDEX IF EXISTS "idx_tribemember_member__a75168";
+CREATE INDEX IF NOT EXISTS "idx_tribemember_guild_i_7d81bb" ON "tribemember" ("guild_id", "member_id");
+ALTER TABLE "tribe_join_applications" ADD COLUMN "guild_id" INT NOT NULL DEFAULT 0;
+UPDATE "tribe_join_applications" SET "guild_id" = (SELECT "guild_config_id" FROM "tribes" WHERE "tribes"."id" = "tribe_join_applications"."tribe_id");
+CREATE INDEX IF NOT EXISTS "idx_tribe_join__guild_i_514099" ON "tribe_join_applications" ("guild_id", "applicant");
+ALTER TABLE "tribemember" ALTER COLUMN "guild_id" DROP DEFAULT;
+ALTER TABLE "tribe_join_applications" ALTER COLUMN "guild_id" DROP DEFAULT;
@@ -0,0 +1,15 @@
+CREATE TABLE IF NOT EXISTS "tribe_banners" (
+    "id" SERIAL NOT NULL PRIMARY KEY,
+    "description" TEXT NOT NULL,
+    "image" TEXT NOT NULL,
+    "tribe_id" INT NOT NULL UNIQUE REFERENCES "tribes" ("id") ON DELETE CASCADE
+);
+COMMENT ON TABLE "tribe_banners" IS 'Banner of a tribe, kept apart from the tribe so loading tribes doesn''t load banners.';
+INSERT INTO "tribe_banners" ("tribe_id", "description", "image")
+    SELECT "id",
+           COALESCE("banner"->>'description', ''),
+           COALESCE("banner"->>'image', '')
+    FROM "tribes"
+    WHERE COALESCE("banner"->>'description', '') != ''
+       OR COALESCE("banner"->>'image', '') != '';
+ALTER TABLE "tribes" DROP COLUMN "banner";
@@ -0,0 +1,44 @@
+-- schema created by the versions before the migrations, for reference
+CREATE TABLE IF NOT EXISTS "guild_configs" (
+    "guild_id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "leaders_role" INT,
+    "urls" INT
+) /* Guild configuration model */;
+CREATE TABLE IF NOT EXISTS "monitor_checkpoints" (
+    "name" VARCHAR(30) NOT NULL  PRIMARY KEY,
+    "cursor" BIGINT,
+    "sweep_started" TIMESTAMP
+) /* Progress of a periodic sweep over the guild configurations */;
+CREATE TABLE IF NOT EXISTS "tribe_categories" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "name" VARCHAR(30) NOT NULL,
+    "guild_config_id" INT NOT NULL REFERENCES "guild_configs" ("guild_id") ON DELETE CASCADE
+) /* A gategory a tribe can be a part of. */;
+CREATE TABLE IF NOT EXISTS "tribes" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "created" TIMESTAMP NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "name" VARCHAR(30) NOT NULL,
+    "leader" INT NOT NULL,
+    "manager" INT,
+    "banner" JSON NOT NULL,
+    "color" INT NOT NULL  DEFAULT 16711680,
+    "category_id" INT REFERENCES "tribe_categories" ("id") ON DELETE CASCADE,
+    "guild_config_id" INT NOT NULL REFERENCES "guild_configs" ("guild_id") ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS "log_entries" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "created" TIMESTAMP NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "text" TEXT NOT NULL,
+    "tribe_id" INT NOT NULL REFERENCES "tribes" ("id") ON DELETE CASCADE
+) /* Log entry model for tribes. */;
+CREATE TABLE IF NOT EXISTS "tribe_join_applications" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "created" TIMESTAMP NOT NULL  DEFAULT CURRENT_TIMESTAMP,
+    "applicant" INT NOT NULL,
+    "tribe_id" INT NOT NULL REFERENCES "tribes" ("id") ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS "tribemember" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "member_id" INT NOT NULL,
+    "tribe_id" INT NOT NULL REFERENCES "tribes" ("id") ON DELETE CASCADE
+);
@@ -0,0 +1,11 @@
+ALTER TABLE "tribe_categories" ADD COLUMN "name_key" VARCHAR(30) NOT NULL DEFAULT '';
+UPDATE "tribe_categories" SET "name_key" = LOWER(TRIM("name"));
+CREATE UNIQUE INDEX IF NOT EXISTS "uid_tribe_categ_guild_c_abae5c" ON "tribe_categories" ("guild_config_id", "name_key");
+CREATE INDEX IF NOT EXISTS "idx_tribes_leader_cbbec8" ON "tribes" ("leader");
+CREATE INDEX IF NOT EXISTS "idx_tribes_manager_1dc1a7" ON "tribes" ("manager");
+CREATE INDEX IF NOT EXISTS "idx_tribes_guild_c_9affc6" ON "tribes" ("guild_config_id", "name");
+DELETE FROM "tribemember" WHERE "id" NOT IN (SELECT MIN("id") FROM "tribemember" GROUP BY "tribe_id", "member_id");
+CREATE UNIQUE INDEX IF NOT EXISTS "uid_tribemember_tribe_i_e25939" ON "tribemember" ("tribe_id", "member_id");
+CREATE INDEX IF NOT EXISTS "idx_tribemember_member__a75168" ON "tribemember" ("member_id");
+DELETE FROM "tribe_join_applications" WHERE "id" NOT IN (SELECT MIN("id") FROM "tribe_join_applications" GROUP BY "tribe_id", "applicant");
+CREATE UNIQUE INDEX IF NOT EXISTS "uid_tribe_join__tribe_i_45c2bf" ON "tribe_join_applications" ("tribe_id", "applicant");
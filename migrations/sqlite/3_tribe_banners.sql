@@ -0,0 +1,14 @@
+CREATE TABLE IF NOT EXISTS "tribe_banners" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "description" TEXT NOT NULL,
+    "image" TEXT NOT NULL,
+    "tribe_id" INT NOT NULL UNIQUE REFERENCES "tribes" ("id") ON DELETE CASCADE
+) /* Banner of a tribe, kept apart from the tribe so loading tribes doesn't load banners. */;
+INSERT INTO "tribe_banners" ("tribe_id", "description", "image")
+    SELECT "id",
+           COALESCE(json_extract("banner", '$.description'), ''),
+           COALESCE(json_extract("banner", '$.image'), '')
+    FROM "tribes"
+    WHERE COALESCE(json_extract("banner", '$.description'), '') != ''
+       OR COALESCE(json_extract("banner", '$.image'), '') != '';
+ALTER TABLE "tribes" DROP COLUMN "banner";
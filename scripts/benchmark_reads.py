@@ -0,0 +1,108 @@
+"""
+Benchmark of the tribe read paths on an in-memory sqlite database
+Compares loading tribes with the old JSON banner column against the current schema (banners in a side table),
+and full model instances against the narrow projections of `controllers/queries.py`.
+
+Run it from the project's root:
+    python -m scripts.benchmark_reads [--tribes 10000] [--members 2] [--runs 5]
+"""
+import argparse
+import asyncio
+import os
+import tracemalloc
+from time import perf_counter
+from typing import Awaitable, Callable
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://:memory:') # read when tribalbot.src.constants is imported
+
+from tortoise import Tortoise, fields
+from tortoise.models import Model
+
+from tribalbot.src.controllers.queries import guild_memberships, guild_tribe_names, guild_tribe_staff
+from tribalbot.src.orm.models import GuildConfig, Tribe, TribeBanner, TribeMember
+
+GUILD_ID = 1
+BANNER = {'description': 'We hunt at dawn and feast at dusk. ' * 8, 'image': 'https://example.com/banners/tribe.png'}
+
+
+class LegacyTribe(Model):
+    """The tribes table before the banners were moved out of it"""
+    created = fields.DatetimeField(auto_now_add=True)
+    guild_config_id = fields.IntField()
+    name = fields.CharField(max_length=30)
+    leader = fields.IntField()
+    manager = fields.IntField(null=True)
+    category_id = fields.IntField(null=True)
+    color = fields.IntField()
+    banner = fields.JSONField()
+
+    class Meta:
+        table = 'legacy_tribes'
+
+
+async def populate(tribes: int, members: int):
+    """Creates the tribes of a single guild in both tables, a third of them with a banner"""
+    await GuildConfig.create(guild_id=GUILD_ID)
+    rows = [
+        dict(guild_config_id=GUILD_ID, name=f'T{i:05}', leader=i, manager=i + tribes if i % 2 else None, color=0xff0000)
+        for i in range(1, tribes + 1)
+    ]
+    await LegacyTribe.bulk_create([
+        LegacyTribe(banner=BANNER if i % 3 == 0 else {'description': '', 'image': ''}, **row)
+        for i, row in enumerate(rows)
+    ], batch_size=500)
+    await Tribe.bulk_create([Tribe(**row) for row in rows], batch_size=500)
+
+    pks = await Tribe.filter(guild_config_id=GUILD_ID).values_list('id', flat=True)
+    await TribeBanner.bulk_create([TribeBanner(tribe_id=pk, **BANNER) for pk in pks[::3]], batch_size=500)
+    await TribeMember.bulk_create([
+        TribeMember(tribe_id=pk, guild_id=GUILD_ID, member_id=pk * 10 + n)
+        for pk in pks for n in range(members)
+    ], batch_size=500)
+
+
+async def measure(load: Callable[[], Awaitable[list]], runs: int) -> tuple[int, float, float]:
+    """Returns the rows, the best time per row (us) and the memory held by the result per row (bytes)"""
+    best = float('inf')
+    for _ in range(runs):
+        start = perf_counter()
+        rows = await load()
+        best = min(best, perf_counter() - start)
+    del rows
+
+    tracemalloc.start()
+    rows = await load()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(rows), best / len(rows) * 1e6, held / len(rows)
+
+
+async def main(tribes: int, members: int, runs: int):
+    await Tortoise.init(db_url='sqlite://:memory:', modules={'models': ['tribalbot.src.orm.models', __name__]})
+    await Tortoise.generate_schemas()
+    try:
+        await populate(tribes, members)
+        cases = {
+            'tribes with the JSON banner (before)': lambda: LegacyTribe.filter(guild_config_id=GUILD_ID),
+            'tribes (banners in tribe_banners)': lambda: Tribe.filter(guild_config_id=GUILD_ID),
+            "tribes .only('id', 'name')": lambda: Tribe.filter(guild_config_id=GUILD_ID).only('id', 'name'),
+            'guild_tribe_names': lambda: guild_tribe_names(GUILD_ID),
+            'guild_tribe_staff': lambda: guild_tribe_staff(GUILD_ID),
+            'memberships (models)': lambda: TribeMember.filter(guild_id=GUILD_ID),
+            'guild_memberships': lambda: guild_memberships(GUILD_ID),
+        }
+        print(f'[!] {tribes} tribes, {tribes * members} memberships, best of {runs}')
+        for name, load in cases.items():
+            rows, latency, memory = await measure(load, runs)
+            print(f'{name:<40} {rows:>7} rows {latency:>7.1f} us/row {memory:>6.0f} B/row {latency * rows / 1000:>8.1f} ms total')
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tribes', type=int, default=10_000)
+    parser.add_argument('--members', type=int, default=2, help='members per tribe')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.tribes, args.members, args.runs))
@@ -0,0 +1,26 @@
+import asyncio
+import os
+
+import pytest
+
+# the settings are read when tribalbot.src.constants is imported
+os.environ.setdefault('DATABASE_URL', 'sqlite://:memory:')
+
+
+@pytest.fixture
+def run_db():
+    """Returns a function that runs a coroutine function against a fresh in-memory sqlite database"""
+    from tortoise import Tortoise
+    from tribalbot.src.controllers.configs import guild_config_cache
+    
+    def run(main):
+        guild_config_cache.clear() # the configurations cached by previous tests belong to other databases
+        async def wrapper():
+            await Tortoise.init(db_url='sqlite://:memory:', modules={'models': ['tribalbot.src.orm.models']})
+            await Tortoise.generate_schemas()
+            try:
+                return await main()
+            finally:
+                await Tortoise.close_connections()
+        return asyncio.run(wrapper())
+    return run
@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from tribalbot.src.controllers.errors import AlreadyTribeMember, DuplicateApplication
+from tribalbot.src.controllers.tribes import (
+    accept_all_applications,
+    accept_applicant,
+    create_tribe_join_application,
+)
+from tribalbot.src.orm.models import GuildConfig, Tribe, TribeJoinApplication, TribeMember
+from tribalbot.src.utils.presence import presence_index
+
+guild = SimpleNamespace(id=1, chunked=True, members=[SimpleNamespace(id=i) for i in (1, 2, 3)], member_count=3)
+
+
+async def create_tribe() -> Tribe:
+    config = await GuildConfig.create(guild_id=guild.id)
+    return await Tribe.create(guild_config=config, name='T00', leader=1)
+
+
+def test_duplicate_application_is_reported(run_db):
+    async def main():
+        tribe = await create_tribe()
+        interaction = SimpleNamespace(user=SimpleNamespace(id=2))
+        assert await create_tribe_join_application(tribe, interaction)
+        with pytest.raises(DuplicateApplication):
+            await create_tribe_join_application(tribe, interaction)
+    
+    run_db(main)
+
+
+def test_application_accepted_twice(run_db):
+    async def main():
+        tribe = await create_tribe()
+        application = await TribeJoinApplication.create(tribe=tribe, guild_id=guild.id, applicant=2)
+        applicant = SimpleNamespace(id=2, guild=guild)
+        
+        results = await asyncio.gather(
+            accept_applicant(applicant, application), 
+            accept_applicant(applicant, application), 
+            return_exceptions=True
+        )
+        
+        assert results.count(None) == 1 and any(isinstance(result, AlreadyTribeMember) for result in results)
+        assert await TribeMember.filter(tribe_id=tribe.pk, member_id=2).count() == 1
+        assert not await TribeJoinApplication.exists(tribe_id=tribe.pk)
+    
+    run_db(main)
+
+
+def test_accept_all_skips_members(run_db):
+    async def main():
+        presence_index.drop(guild.id)
+        tribe = await create_tribe()
+        await TribeJoinApplication.create(tribe=tribe, guild_id=guild.id, applicant=2)
+        await TribeJoinApplication.create(tribe=tribe, guild_id=guild.id, applicant=3)
+        await TribeMember.create(tribe=tribe, guild_id=guild.id, member_id=2) # approved concurrently
+        
+        review = await accept_all_applications(tribe, guild)
+        
+        assert review == ({3}, set(), {2})
+        assert set(await TribeMember.filter(tribe_id=tribe.pk).values_list('member_id', flat=True)) == {2, 3}
+        assert not await TribeJoinApplication.exists(tribe_id=tribe.pk)
+    
+    run_db(main)
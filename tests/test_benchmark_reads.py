@@ -0,0 +1,11 @@
+import asyncio
+
+from scripts.benchmark_reads import main
+
+
+def test_benchmark_runs(capsys):
+    asyncio.run(main(tribes=30, members=1, runs=1))
+    
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == '[!] 30 tribes, 30 memberships, best of 1'
+    assert len(lines) == 8
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from tribalbot.src.utils.cache import CacheEngine, KeystrokeTracker
+
+
+def test_superseded_keystroke_load_fills_the_cache():
+    async def main():
+        cache = CacheEngine(ttl=60, max_entries=10, max_weight=100)
+        keystrokes = KeystrokeTracker()
+        loads = 0
+        release = asyncio.Event()
+        
+        async def load():
+            nonlocal loads
+            loads += 1
+            await release.wait()
+            return ['T00']
+        
+        first = asyncio.create_task(keystrokes.run('slot', cache.get_or_load('key', load)))
+        await asyncio.sleep(0) # the first keystroke starts the load
+        second = asyncio.create_task(keystrokes.run('slot', cache.get_or_load('key', load)))
+        for _ in range(3): # the second keystroke supersedes the first one and joins its load
+            await asyncio.sleep(0)
+        release.set()
+        
+        assert await first is None
+        assert await second == ['T00']
+        assert loads == 1
+        assert keystrokes.superseded == 1 and cache.loads_saved == 1
+        
+        release.clear()
+        abandoned = asyncio.create_task(cache.get_or_load('other', load))
+        await asyncio.sleep(0)
+        abandoned.cancel() # every caller left, the load still completes
+        await asyncio.sleep(0)
+        assert cache.abandoned == 1
+        release.set()
+        await asyncio.sleep(0)
+        assert await cache.get_or_load('other', load) == ['T00']
+        assert loads == 2
+    
+    asyncio.run(main())
+
+
+def test_caller_cancelled_after_the_load_finished():
+    async def main():
+        cache = CacheEngine(ttl=60, max_entries=10, max_weight=100)
+        
+        async def load():
+            return [1]
+        
+        caller = asyncio.create_task(cache.get_or_load('key', load))
+        await asyncio.sleep(0) # the caller starts the load and awaits it
+        await asyncio.sleep(0) # the load finishes, the caller hasn't resumed yet
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        assert cache.get('key') == [1]
+    
+    asyncio.run(main())
+
+
+def test_clear_forgets_the_loads_in_flight():
+    async def main():
+        cache = CacheEngine(ttl=60, max_entries=10, max_weight=100)
+        release = asyncio.Event()
+        
+        async def load():
+            await release.wait()
+            return [1]
+        
+        caller = asyncio.create_task(cache.get_or_load('key', load))
+        await asyncio.sleep(0)
+        cache.clear()
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        release.set()
+        await asyncio.sleep(0)
+        assert 'key' not in cache
+    
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+import pytest
+
+from tribalbot.src.controllers.directory import tribe_directory
+from tribalbot.src.controllers.errors import AmbiguousTribeName, DuplicateTribeName
+from tribalbot.src.controllers.pagination import guild_tribe_pages
+from tribalbot.src.controllers.tribes import (
+    create_new_tribe,
+    disband_tribe,
+    get_all_guild_tribes,
+    get_tribe_banner,
+    get_tribe_by_name,
+    set_tribe_banner,
+)
+from tribalbot.src.orm.models import GuildConfig, Tribe, TribeMember
+from tribalbot.src.orm.scope import get_related, open_scope
+
+guild = SimpleNamespace(id=1)
+
+
+@pytest.fixture(params=[False, True], ids=['database', 'directory'])
+def directory_loaded(request):
+    yield request.param
+    tribe_directory.loaded = False
+    tribe_directory._guilds.clear()
+
+
+def test_duplicate_names_are_not_hidden(run_db, directory_loaded):
+    async def main():
+        config = await GuildConfig.create(guild_id=guild.id)
+        first = await Tribe.create(guild_config=config, name='T00', leader=1)
+        duplicate = await Tribe.create(guild_config=config, name='T00', leader=2) # created before names were checked
+        await Tribe.create(guild_config=config, name='T01', leader=3)
+        if directory_loaded:
+            await tribe_directory.load()
+        
+        assert len(await get_all_guild_tribes(guild)) == 3
+        assert len(await guild_tribe_pages(guild)) == 3
+        with pytest.raises(AmbiguousTribeName):
+            await get_tribe_by_name(guild, 'T00')
+        
+        await disband_tribe(duplicate)
+        assert (await get_tribe_by_name(guild, 'T00')).pk == first.pk
+    
+    run_db(main)
+
+
+def test_create_rejects_duplicate_names(run_db, directory_loaded):
+    async def main():
+        await GuildConfig.create(guild_id=guild.id)
+        if directory_loaded:
+            await tribe_directory.load()
+        await create_new_tribe(guild, 'T00', 0, SimpleNamespace(id=1))
+        with pytest.raises(DuplicateTribeName):
+            await create_new_tribe(guild, 'T00', 0, SimpleNamespace(id=2))
+    
+    run_db(main)
+
+
+def test_banner_color_reaches_the_directory(run_db):
+    async def main():
+        config = await GuildConfig.create(guild_id=guild.id)
+        await Tribe.create(guild_config=config, name='T00', leader=1)
+        await tribe_directory.load()
+        tribe = await get_tribe_by_name(guild, 'T00')
+        
+        await set_tribe_banner(tribe, 'we raid', '', color=0x00ff00)
+        
+        assert (await Tribe.get(pk=tribe.pk)).color == 0x00ff00
+        assert (await get_tribe_by_name(guild, 'T00')).color == 0x00ff00
+        assert (await get_tribe_banner(tribe)).description == 'we raid'
+    
+    try:
+        run_db(main)
+    finally:
+        tribe_directory.loaded = False
+        tribe_directory._guilds.clear()
+
+
+def test_related_members_are_not_kept_by_the_shared_tribe(run_db):
+    async def main():
+        config = await GuildConfig.create(guild_id=guild.id)
+        tribe = await Tribe.create(guild_config=config, name='T00', leader=1)
+        await TribeMember.create(tribe=tribe, guild_id=guild.id, member_id=2)
+        
+        open_scope()
+        assert [tm.member_id for tm in await get_related(tribe, 'members')] == [2]
+        assert '_members' not in vars(tribe) # the relation of the instance was never touched
+    
+    run_db(main)
@@ -0,0 +1,80 @@
+"""
+The sqlite upgrade scripts must turn a database created by the versions before the migrations,
+with its data, into the schema the bot creates today.
+"""
+import asyncio
+import sqlite3
+from pathlib import Path
+
+from tortoise import Tortoise
+
+from tribalbot.src.controllers.tribes import get_tribe_banner, members_with_tribe_in_category
+from tribalbot.src.orm.helpers import sync_name_keys
+from tribalbot.src.orm.models import Tribe, TribeCategory, TribeJoinApplication, TribeMember, normalize_name
+
+MIGRATIONS = Path(__file__).parent.parent / 'migrations' / 'sqlite'
+
+OLD_DATA = """
+INSERT INTO "guild_configs" ("guild_id") VALUES (1);
+INSERT INTO "tribe_categories" ("id", "name", "guild_config_id") VALUES (1, ' Raiders ', 1), (2, 'ÉLITE\u00a0', 1);
+INSERT INTO "tribes" ("id", "name", "leader", "banner", "category_id", "guild_config_id") VALUES
+    (1, 'T00', 10, '{"description": "we raid", "image": ""}', 1, 1),
+    (2, 'T01', 20, '{"description": "", "image": ""}', NULL, 1);
+INSERT INTO "tribemember" ("member_id", "tribe_id") VALUES (11, 1), (11, 1), (21, 2);
+INSERT INTO "tribe_join_applications" ("applicant", "tribe_id") VALUES (30, 1), (30, 1);
+"""
+
+
+def schema(path: Path) -> dict[str, tuple[set[str], set[tuple]]]:
+    """Returns the columns and the indexes (as (unique, columns) pairs) of every table of the database
+    Index names are left out, sqlite names the inline unique constraints itself
+    """
+    with sqlite3.connect(path) as connection:
+        tables = [
+            row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+        ]
+        return {
+            table: (
+                {column[1] for column in connection.execute(f'PRAGMA table_info("{table}")')},
+                {
+                    (index[2], tuple(column[2] for column in connection.execute(f'PRAGMA index_info("{index[1]}")')))
+                    for index in connection.execute(f'PRAGMA index_list("{table}")')
+                },
+            )
+            for table in tables
+        }
+
+
+async def create_current_schema(path: Path):
+    await Tortoise.init(db_url=f'sqlite://{path}', modules={'models': ['tribalbot.src.orm.models']})
+    await Tortoise.generate_schemas()
+    await Tortoise.close_connections()
+
+
+def test_sqlite_upgrade_scripts(tmp_path):
+    old, current = tmp_path / 'old.sqlite3', tmp_path / 'current.sqlite3'
+    with sqlite3.connect(old) as connection:
+        connection.executescript((MIGRATIONS / '0_init.sql').read_text())
+        connection.executescript(OLD_DATA)
+        for script in sorted(MIGRATIONS.glob('*.sql'))[1:]:
+            connection.executescript(script.read_text())
+    asyncio.run(create_current_schema(current))
+    
+    assert schema(old) == schema(current)
+    
+    async def main():
+        await Tortoise.init(db_url=f'sqlite://{old}', modules={'models': ['tribalbot.src.orm.models']})
+        try:
+            raiders, default = await Tribe.filter(id__in=[1, 2]).order_by('id')
+            assert (await get_tribe_banner(raiders)).description == 'we raid'
+            assert await get_tribe_banner(default) is None
+            assert await TribeCategory.get(guild_config_id=1, name_key='raiders')
+            assert await sync_name_keys() == 1 # sqlite's LOWER and TRIM left 'Élite\u00a0'
+            assert (await TribeCategory.get(id=2)).name_key == normalize_name('élite') == 'élite'
+            assert await TribeMember.filter(guild_id=1).count() == 2
+            assert await TribeJoinApplication.filter(guild_id=1, applicant=30).count() == 1
+            assert await members_with_tribe_in_category(1, [10, 11, 20, 21], 1) == {10, 11}
+        finally:
+            await Tortoise.close_connections()
+    
+    asyncio.run(main())
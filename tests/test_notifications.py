@@ -0,0 +1,26 @@
+import asyncio
+
+from discord import Embed
+
+from tribalbot.src.utils.notifications import dm_queue, queue_dm
+
+
+class FakeUser:
+    def __init__(self):
+        self.received: list[Embed] = []
+    
+    async def send(self, *, embed: Embed):
+        self.received.append(embed)
+
+
+def test_queue_dm_sends_embeds_in_order():
+    async def main():
+        user = FakeUser()
+        accepted, rejected = Embed(title='accepted'), Embed(title='rejected')
+        queue_dm(user, accepted)
+        queue_dm(user, rejected)
+        queue_dm(None, accepted) # members that left the guild are skipped
+        await dm_queue.flush_all()
+        return user.received
+    
+    assert [embed.title for embed in asyncio.run(main())] == ['accepted', 'rejected']
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from tribalbot.src.utils.presence import PresenceIndex
+
+
+def make_guild(*member_ids: int, member_count: int | None = None):
+    return SimpleNamespace(
+        id=1,
+        chunked=True,
+        members=[SimpleNamespace(id=member_id) for member_id in member_ids],
+        member_count=len(member_ids) if member_count is None else member_count,
+    )
+
+
+def test_index_is_rebuilt_when_the_member_count_drifts():
+    index = PresenceIndex()
+    assert index.get(make_guild(1, 2, 3)).missing({1, 2, 3}) == set()
+    # the bot was disconnected while 3 left and 4 joined, the cache was chunked again
+    reconnected = make_guild(1, 2, 4, 5)
+    presence = index.get(reconnected)
+    assert 4 in presence and 5 in presence
+    assert presence.missing({1, 3}) == {3}
+
+
+def test_dropped_index_is_rebuilt():
+    index = PresenceIndex()
+    index.get(make_guild(1, 2))
+    index.drop(1)
+    assert 3 in index.get(make_guild(1, 3))
+
+
+def test_events_keep_the_index_in_sync():
+    index = PresenceIndex()
+    guild = make_guild(1, 2)
+    presence = index.get(guild)
+    member = SimpleNamespace(id=3, guild=guild)
+    guild.member_count += 1
+    index.member_joined(member)
+    assert index.get(guild) is presence and 3 in presence
+
+
+def test_partial_index_is_built_once_until_chunked():
+    index = PresenceIndex()
+    guild = make_guild(1, 2, member_count=1000) # the member cache isn't complete
+    guild.chunked = False
+    presence = index.get(guild)
+    assert index.get(guild) is presence
+    
+    guild.members.append(SimpleNamespace(id=3))
+    guild.chunked = True
+    assert 3 in index.get(guild)
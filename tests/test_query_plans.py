@@ -0,0 +1,43 @@
+"""
+The hot controller queries must be answered from an index, never with a full table scan.
+Checked with EXPLAIN QUERY PLAN on sqlite.
+"""
+import pytest
+from tortoise import Tortoise
+
+from tribalbot.src.controllers.tribes import (
+    _category_leaders, _category_members, _member_tribes_query, _membership_tribes
+)
+from tribalbot.src.orm.models import Tribe, TribeCategory, TribeJoinApplication, TribeMember, normalize_name
+
+HOT_QUERIES = {
+    'tribe by name': lambda: Tribe.filter(guild_config_id=1, name='tribe'),
+    'tribes led by a user': lambda: Tribe.filter(guild_config_id=1, leader=10),
+    'tribes managed by a user': lambda: Tribe.filter(guild_config_id=1, manager=10),
+    'tribes of a member': lambda: Tribe.filter(id__in=_membership_tribes(1, 10)),
+    'tribes of a user': lambda: _member_tribes_query(1, 10),
+    'category leaders': lambda: _category_leaders(1, [10, 11], 2),
+    'category members': lambda: _category_members(1, [10, 11], 2),
+    'membership': lambda: TribeMember.filter(tribe_id=1, member_id=10),
+    'memberships in a guild': lambda: TribeMember.filter(guild_id=1, member_id__in=[10, 11]),
+    'category by name': lambda: TribeCategory.filter(guild_config_id=1, name_key=normalize_name('Raiders')),
+    'pending application': lambda: TribeJoinApplication.filter(tribe_id=1, applicant=10),
+    'applications in a guild': lambda: TribeJoinApplication.filter(guild_id=1),
+}
+
+
+def full_scans(plan: list[str]) -> list[str]:
+    """Returns the steps of the plan that read a whole table"""
+    return [step for step in plan if step.startswith('SCAN') and ' USING ' not in step]
+
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_hot_query_uses_an_index(run_db, name):
+    async def main():
+        connection = Tortoise.get_connection('default')
+        _, rows = await connection.execute_query('EXPLAIN QUERY PLAN ' + HOT_QUERIES[name]().sql())
+        return [row['detail'] for row in rows]
+    
+    plan = run_db(main)
+    assert not full_scans(plan), plan
+    assert any(' USING ' in step for step in plan), plan
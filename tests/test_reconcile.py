@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+
+from tribalbot.src.bot.cogs.loops import MonitorCog
+from tribalbot.src.controllers.tribes import reconcile_guild_tribes, remove_departed_members
+from tribalbot.src.orm.models import GuildConfig, Tribe, TribeMember
+from tribalbot.src.utils.presence import presence_index
+
+
+def make_guild(*member_ids: int):
+    members = {member_id: SimpleNamespace(id=member_id) for member_id in member_ids}
+    return SimpleNamespace(
+        id=1,
+        chunked=True,
+        members=list(members.values()),
+        member_count=len(members),
+        get_member=members.get,
+    )
+
+
+async def create_tribe(leader: int, *member_ids: int) -> Tribe:
+    config = await GuildConfig.create(guild_id=1)
+    tribe = await Tribe.create(guild_config=config, name='T00', leader=leader)
+    await TribeMember.bulk_create(TribeMember(tribe=tribe, member_id=member_id, guild_id=1) for member_id in member_ids)
+    return tribe
+
+
+def test_concurrent_reconciliations_promote_a_single_member(run_db):
+    async def main():
+        tribe = await create_tribe(1, *range(2, 12))
+        guild = make_guild(*range(3, 12)) # the leader and member 2 left, there's no manager
+        presence_index.drop(guild.id)
+        
+        await asyncio.gather(reconcile_guild_tribes(guild), remove_departed_members(guild, {1, 2}))
+        
+        await tribe.refresh_from_db()
+        members = set(await TribeMember.filter(tribe_id=tribe.pk).values_list('member_id', flat=True))
+        assert tribe.leader in range(3, 12)
+        assert members == set(range(3, 12)) - {tribe.leader}
+    
+    run_db(main)
+
+
+def test_members_that_join_again_keep_their_tribes(run_db):
+    async def main():
+        tribe = await create_tribe(1, 2, 3)
+        guild = make_guild(1, 2) # 2 left and joined again before the departures were flushed, 3 is gone
+        presence_index.drop(guild.id)
+        monitor = MonitorCog(SimpleNamespace(get_guild=lambda guild_id: guild))
+        
+        await monitor.flush_departures(guild.id, {2, 3})
+        
+        assert set(await TribeMember.filter(tribe_id=tribe.pk).values_list('member_id', flat=True)) == {2}
+    
+    run_db(main)
@@ -0,0 +1,19 @@
+from tribalbot.src.controllers.tribes import members_with_tribe_in_category
+from tribalbot.src.orm.models import GuildConfig, Tribe, TribeCategory, TribeMember
+
+
+def test_members_with_tribe_in_category(run_db):
+    async def main():
+        config = await GuildConfig.create(guild_id=1)
+        category = await TribeCategory.create(guild_config=config, name='Raiders')
+        raiders = await Tribe.create(guild_config=config, category=category, name='T00', leader=1)
+        default = await Tribe.create(guild_config=config, name='T01', leader=2)
+        await TribeMember.create(tribe=raiders, member_id=3, guild_id=1)
+        await TribeMember.create(tribe=default, member_id=4, guild_id=1)
+        
+        users = range(1, 6)
+        assert await members_with_tribe_in_category(1, users, category.pk) == {1, 3}
+        assert await members_with_tribe_in_category(1, users, None) == {2, 4}
+        assert await members_with_tribe_in_category(2, users, None) == set()
+    
+    run_db(main)
@@ -7,19 +7,28 @@ from pathlib import Path
 
 import discord
 from discord.ext.commands import Bot
-from discord import Interaction
+from discord import Interaction, app_commands
 from discord.app_commands import AppCommandError
 from discord.app_commands.errors import CommandNotFound
 # from discord import app_commands
 
 from tribalbot.src.constants import guild_id, DEV_MODE
 from tribalbot.src.orm.config import *
+from tribalbot.src.controllers.directory import tribe_directory
+from tribalbot.src.orm.scope import open_scope
 from tribalbot.src.utils.misc import separator
 
 _allowed_errors = (
     CommandNotFound,
 )
 
+class TribalTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: Interaction) -> bool:
+        # runs in the task that handles the interaction, before checks, autocompletes and callbacks
+        open_scope()
+        return True
+
+
 class TribalBot(Bot):
     def __init__(self, *args, **options):
         # Init the bot with default intents since there won't be prefixed commands
@@ -31,6 +40,7 @@ class TribalBot(Bot):
             *args, 
             command_prefix='?', 
             intents=intents,
+            tree_cls=TribalTree,
             **options
         )
         tree = self.tree
@@ -48,6 +58,7 @@ class TribalBot(Bot):
     
     async def setup_hook(self) -> None:
         await init_db()
+        await tribe_directory.load()
         await self.load_cogs()
         
         
@@ -5,12 +5,23 @@ Small concrete helpers specific to cogs
 from discord import Interaction, Member, Embed, Color
 
 from tribalbot.src.orm.models import Tribe
-from tribalbot.src.controllers.tribes import get_tribe_by_name
+from tribalbot.src.controllers.tribes import get_tribe_by_name, get_tribe_by_pk
+from tribalbot.src.controllers.errors import AmbiguousTribeName
 
 
 async def get_tribe(interaction: Interaction, tribe_name) -> Tribe | None:
-    """Returns the tribe or handles the response to the user in case it doesn't exist"""
-    tribe = await get_tribe_by_name(interaction.guild, tribe_name)
+    """Returns the tribe or handles the response to the user in case it doesn't exist
+    Tribes that share their name with others can be picked by id with "#<id>"
+    """
+    try:
+        tribe = await get_tribe_by_name(interaction.guild, tribe_name)
+    except AmbiguousTribeName as err:
+        return await interaction.response.send_message(
+            f'{err}, use "#<id>" instead of the name to pick one',
+            ephemeral=True
+        )
+    if not tribe and tribe_name.startswith('#') and tribe_name[1:].isdigit():
+        tribe = await get_tribe_by_pk(interaction.guild, int(tribe_name[1:]))
     if not tribe:
         return await interaction.response.send_message(
             f'There\'s no tribe with the name "{tribe_name}"',
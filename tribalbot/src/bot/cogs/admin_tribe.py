@@ -3,7 +3,7 @@ from discord import app_commands, Interaction
 
 from ..bot import TribalBot
 from tribalbot.src.utils.tribes import *
-from tribalbot.src.controllers.tribes import handle_leader_leave
+from tribalbot.src.controllers.tribes import disband_tribe, handle_leader_leave, remove_tribe_member
 
 from ._utils import get_tribe
 
@@ -18,7 +18,7 @@ class AdminTribeCog(Cog, description='Tribe Commands for Admins'):
         print(f'[-] {self.qualified_name} unloaded')
     
     @app_commands.command(
-        tribe_name='tribe-force-disband',
+        name='tribe-force-disband',
         description='Disolves the target tribe. Requieres Manage Server permission'
     )
     @app_commands.describe(tribe_name='The trib eyou want to disolve')
@@ -55,7 +55,7 @@ class AdminTribeCog(Cog, description='Tribe Commands for Admins'):
                     await m.send(embed=embed)
                 except: pass # members don't support dms
 
-        await tribe.delete()
+        await disband_tribe(tribe)
         
         await interaction.response.send_message(
             f'Done! the tribe "**{tribe.name}**" has been deleted.',
@@ -76,11 +76,8 @@ class AdminTribeCog(Cog, description='Tribe Commands for Admins'):
         tribe = await get_tribe(interaction, tribe_name)
         if not tribe: return
         
-        members = TribeMemberCollection(await tribe.members)
-        
-        save_tribe = True
         if tribe.leader == member.id:
-            result = await handle_leader_leave(tribe, members)
+            result = await handle_leader_leave(tribe)
             if result:
                 new_leader = interaction.guild.get_member(tribe.leader)
                 
@@ -99,27 +96,26 @@ class AdminTribeCog(Cog, description='Tribe Commands for Admins'):
                     f'and {new_leader.mention} was appointed as the new leader',
                     ephemeral=True
                 )
-        elif member.id in members.ids:
-            await members.remove_member(member.id)
-            if member.id == tribe.manager:
-                tribe.manager = None
-
         else:
-            save_tribe = False
-        
-        if save_tribe:
             try:
-                await member.send(embed=Embed(
-                    title='An admin kicked you from a tribe',
-                    description=f'Server: **{interaction.guild.name}**\n'
-                                f'Tribe: **{tribe.name}**',
-                    color=Color.red()
-                ))
-            except: pass # member does not allow dms
-            await tribe.save()
+                await remove_tribe_member(tribe, member.id)
+            except ValueError:
+                return await interaction.response.send_message(
+                    f'{member.mention} is not part of the tribe "**{tribe.name}**"',
+                    ephemeral=True
+                )
+        
+        try:
+            await member.send(embed=Embed(
+                title='An admin kicked you from a tribe',
+                description=f'Server: **{interaction.guild.name}**\n'
+                            f'Tribe: **{tribe.name}**',
+                color=Color.red()
+            ))
+        except: pass # member does not allow dms
         
         return await interaction.response.send_message(
-            f'{member.mention} is not part of the tribe "**{tribe.name}**"',
+            f'Done! {member.mention} has been kicked from "**{tribe.name}**"',
             ephemeral=True
         )
         
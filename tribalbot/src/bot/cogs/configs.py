@@ -2,7 +2,13 @@ from discord.ext.commands import Cog
 from discord import app_commands, Interaction, permissions, Role
 
 from ..bot import TribalBot
-from tribalbot.src.controllers.configs import create_new_category, get_guild_config, set_leaders_role
+from tribalbot.src.controllers.configs import (
+    create_new_category, 
+    guild_config_cache, 
+    invalidate_guild_config, 
+    set_banner_urls, 
+    set_leaders_role,
+)
 
 class ConfigurationsCog(Cog, description='Tribe and guild configuration commands'):
     def __init__(self, bot) -> None:
@@ -46,9 +52,7 @@ class ConfigurationsCog(Cog, description='Tribe and guild configuration commands
         itr: Interaction,
         setting: bool
     ):
-        config = await get_guild_config(itr.guild)
-        config.urls = setting
-        await config.save()
+        await set_banner_urls(itr.guild, setting)
         if setting:
             msg = 'Done! Tribes can put URLs in their banners'
         else:
@@ -56,6 +60,20 @@ class ConfigurationsCog(Cog, description='Tribe and guild configuration commands
         
         await itr.response.send_message(msg, ephemeral=True)
     
+    @Cog.listener('on_guild_role_update')
+    async def leaders_role_updated(self, before: Role, after: Role):
+        self.forget_leaders_role(after)
+    
+    @Cog.listener('on_guild_role_delete')
+    async def leaders_role_deleted(self, role: Role):
+        self.forget_leaders_role(role)
+    
+    def forget_leaders_role(self, role: Role):
+        """Drops the cached configuration of the guild if the role is its leaders role"""
+        config = guild_config_cache.get(role.guild.id)
+        if config is not None and config.leaders_role == role.id:
+            invalidate_guild_config(role.guild.id)
+    
 async def setup(bot: TribalBot):
     await bot.add_cog(ConfigurationsCog(bot))
         
\ No newline at end of file
@@ -1,4 +1,9 @@
-from discord import Member, RawMemberRemoveEvent
+import asyncio
+from dataclasses import dataclass
+from time import perf_counter
+
+import discord
+from discord import Guild, Member, RawMemberRemoveEvent
 from discord import app_commands, Interaction
 from discord.ext.commands import Cog
 from discord.ext import tasks
@@ -6,17 +11,40 @@ from discord.ext.tasks import Loop
 
 from ..bot import TribalBot
 from ._utils import notify_new_tribe_leader
-from tribalbot.src.orm.models import Tribe, GuildConfig
-from tribalbot.src.utils.cache import clear_autocomplete_cache
-from tribalbot.src.utils.tribes import TribeMemberCollection
-from tribalbot.src.controllers.tribes import get_all_member_tribes, handle_leader_leave
+from tribalbot.src.constants import (
+    MONITOR_SWEEP_INTERVAL, 
+    MONITOR_TICK_INTERVAL, 
+    MONITOR_TICK_BUDGET, 
+    GUILD_PURGE_GRACE,
+)
+from tribalbot.src.orm.models import Tribe, GuildConfig, MonitorCheckpoint
+from tribalbot.src.utils.queues import CoalescingQueue
+from tribalbot.src.utils.cache import autocomplete_cache, autocomplete_keystrokes
+from tribalbot.src.utils.metrics import operation_latency
+from tribalbot.src.utils.presence import presence_index
+from tribalbot.src.controllers.tribes import reconcile_guild_tribes, remove_departed_members
+from tribalbot.src.controllers.configs import purge_guild_data
+from tribalbot.src.controllers.monitor import get_monitor_checkpoint, guild_config_pages
+
+
+@dataclass
+class _SweepStats:
+    """Counters of a single sweep of the tribe monitor"""
+    guilds: int = 0
+    pruned: int = 0
+    queries: int = 0
+    busy: float = 0.0 # seconds spent working across ticks
 
 
 class MonitorCog(Cog, description='Tribe Monitors'):
     def __init__(self, bot) -> None:
         self.bot: TribalBot = bot
         self.__loops: list[Loop] = []
-        self.__loops.append(clear_autocomplete_cache)
+        self.__checkpoint: MonitorCheckpoint | None = None
+        self.__sweep_stats = _SweepStats()
+        self.__departures: CoalescingQueue[int, int] = CoalescingQueue(self.flush_departures)
+        self.__purges: dict[int, asyncio.Task] = {}
+        self.register_loop(self.tribe_monitor)
         print(f'[+] {self.qualified_name} loaded')
     
     def register_loop(self, loop):
@@ -24,68 +52,149 @@ class MonitorCog(Cog, description='Tribe Monitors'):
         return loop
         
     async def cog_unload(self) -> None:
+        for loop in self.__loops:
+            loop.cancel()
+        await self.__departures.flush_all()
+        for task in self.__purges.values():
+            task.cancel()
         print(f'[-] {self.qualified_name} unloaded')
     
     async def cog_load(self) -> None:
         for loop in self.__loops:
-            await loop.start()
+            loop.start()
     
-            
-    @register_loop
-    @tasks.loop(minutes=5)
+    @tasks.loop(seconds=MONITOR_TICK_INTERVAL)
     async def tribe_monitor(self):
+        """Sweeps every guild once per MONITOR_SWEEP_INTERVAL
+        Each tick works through the guilds for at most MONITOR_TICK_BUDGET seconds and stores 
+        the last swept guild so the next tick (or a restarted bot) continues from there
+        """
         await self.bot.wait_until_ready()
-        async for guild_config in GuildConfig.all():
-            guild = self.bot.get_guild(guild_config.pk)
-            if not guild: # the guild removed the bot
-                await guild_config.delete() 
-            else:
-                tribes = await guild_config.tribes
-                for tribe in tribes:
-                    leader = guild.get_member(tribe.leader)
-                    members = TribeMemberCollection(await tribe.members)
-                    manager = tribe.manager
-                    save_tribe = False
-                    # first check members
-                    for mid in members.ids: # each member id
-                        member = guild.get_member(mid)
-                        if not member:
-                            await members.remove_member(mid)
-                            if member == manager:
-                                tribe.manager = None
-                                save_tribe = True
-                                
-                    # check leader
-                    if not leader:
-                        await handle_leader_leave(tribe, members=members)
-                        save_tribe = False
-                        
-                    if save_tribe: # only triggers if there's a leader and absent manager
-                        await tribe.save()
+        checkpoint = self.__checkpoint = self.__checkpoint or await get_monitor_checkpoint('tribe-monitor')
+        
+        if checkpoint.cursor is None: # there's no sweep in progress
+            now = discord.utils.utcnow()
+            if checkpoint.sweep_started and (now - checkpoint.sweep_started).total_seconds() < MONITOR_SWEEP_INTERVAL:
+                return
+            checkpoint.cursor = 0
+            checkpoint.sweep_started = now
+            self.__sweep_stats = _SweepStats()
+        
+        stats = self.__sweep_stats
+        start = perf_counter()
+        deadline = start + MONITOR_TICK_BUDGET
+        finished = True
+        async for page in guild_config_pages(after=checkpoint.cursor):
+            stats.queries += 1
+            for guild_id in page:
+                guild = self.bot.get_guild(guild_id)
+                if not guild: # the guild removed the bot while it was offline
+                    self.schedule_guild_purge(guild_id)
+                elif guild.chunked: # an incomplete member cache would prune members that are still in the guild
+                    result = await reconcile_guild_tribes(guild)
+                    stats.guilds += 1
+                    stats.pruned += result.pruned
+                    stats.queries += result.queries
+                checkpoint.cursor = guild_id
+                if perf_counter() >= deadline:
+                    finished = False
+                    break
+            if not finished:
+                break
+        else:
+            stats.queries += 1 # the empty page that ends the stream
+        
+        if finished:
+            checkpoint.cursor = None
+        await checkpoint.save()
+        stats.queries += 1
+        stats.busy += perf_counter() - start
+        
+        if finished:
+            print(
+                f'[!] Tribe monitor swept {stats.guilds} guilds in {stats.busy:.2f}s of work, '
+                f'{stats.pruned} members pruned with {stats.queries} queries'
+            )
+            if operation_latency: # tribe operations run since the previous sweep
+                print(f'[!] Tribe operation latency:\n{operation_latency.report()}')
+            print(
+                f'[!] Autocomplete since start: {autocomplete_cache.hits} hits, {autocomplete_cache.misses} misses, '
+                f'{autocomplete_cache.loads_saved} loads saved by joining one in flight, '
+                f'{autocomplete_cache.abandoned} loads finished after their callers left, '
+                f'{autocomplete_keystrokes.superseded} keystrokes superseded'
+            )
     
     @Cog.listener('on_member_remove')
     async def remobe_member_from_tribes(self, member: Member):
         """
         Activates when a member leaves a server. 
-        Scans tribes the member belonged to and clears it of them
+        Queues the member so the departures of the guild are removed from its tribes in a single batch
         """
-        tribes = await get_all_member_tribes(member)
-        for tribe in tribes:
-            members = TribeMemberCollection(await tribe.members)
-            save_tribe = False
-            if member.id == tribe.leader:
-                result = await handle_leader_leave(tribe, members=members)
-                if result and (new_leader := member.guild.get_member(tribe.leader)):
-                    # so far handle_leader_leave does not check if the new leader is actually in the server...
-                    await notify_new_tribe_leader(new_leader, tribe)
-            else:
-                await members.remove_member(member.id)
-                if member.id == tribe.manager:
-                    tribe.manager = None
-                    save_tribe = True
-                    
-            if save_tribe:
-                await tribe.save()
+        presence_index.member_left(member)
+        self.__departures.push(member.guild.id, member.id)
+    
+    @Cog.listener('on_member_join')
+    async def on_member_join(self, member: Member):
+        presence_index.member_joined(member)
+    
+    async def flush_departures(self, guild_id: int, member_ids: set[int]):
+        """Clears the tribes of a guild of a batch of departed members and notifies the new leaders
+        Members that joined the guild again while the batch was queued keep their tribes
+        """
+        guild = self.bot.get_guild(guild_id)
+        if not guild: # the bot was removed from the guild too
+            return
+        departed = {
+            member_id for member_id in presence_index.get(guild).missing(member_ids)
+            if guild.get_member(member_id) is None
+        }
+        if not departed:
+            return
+        result = await remove_departed_members(guild, departed)
+        for tribe in result.new_leaders:
+            if new_leader := guild.get_member(tribe.leader):
+                await notify_new_tribe_leader(new_leader, tribe)
+    
+    @Cog.listener('on_ready')
+    async def on_ready(self):
+        """A new gateway session re-chunks the member cache, the events missed while disconnected are lost"""
+        presence_index.clear()
+    
+    @Cog.listener('on_guild_available')
+    async def on_guild_available(self, guild: Guild):
+        presence_index.drop(guild.id)
+    
+    @Cog.listener('on_guild_unavailable')
+    async def on_guild_unavailable(self, guild: Guild):
+        presence_index.drop(guild.id)
+    
+    @Cog.listener('on_guild_remove')
+    async def on_guild_remove(self, guild: Guild):
+        """Schedules the deletion of the guild's data once the grace period is over"""
+        presence_index.drop(guild.id)
+        self.schedule_guild_purge(guild.id)
+    
+    @Cog.listener('on_guild_join')
+    async def on_guild_join(self, guild: Guild):
+        """Keeps the data of a guild that invited the bot back within the grace period"""
+        if task := self.__purges.pop(guild.id, None):
+            task.cancel()
+    
+    def schedule_guild_purge(self, guild_id: int, delay: float = GUILD_PURGE_GRACE):
+        """Purges the guild's data in the background after `delay` seconds, unless the bot joins it again"""
+        if guild_id not in self.__purges:
+            self.__purges[guild_id] = asyncio.create_task(self.__purge_guild(guild_id, delay))
+    
+    async def __purge_guild(self, guild_id: int, delay: float):
+        try:
+            await asyncio.sleep(delay)
+            if self.bot.get_guild(guild_id): # the bot is back in the guild
+                return
+            deleted = await purge_guild_data(guild_id)
+            print(f'[-] Purged {deleted} rows from the removed guild {guild_id}')
+        finally:
+            if self.__purges.get(guild_id) is asyncio.current_task():
+                del self.__purges[guild_id]
         
 
 async def setup(bot: TribalBot):
@@ -12,8 +12,11 @@ from tribalbot.src.utils.tribes import tribe_banner
 from ..bot import TribalBot
 from tribalbot.src.orm.models import *
 from tribalbot.src.controllers.tribes import *
+from tribalbot.src.controllers.configs import get_guild_config
+from tribalbot.src.controllers.errors import DuplicateApplication
+from tribalbot.src.orm.scope import get_related
+from tribalbot.src.controllers.pagination import ApplicationPages, guild_tribe_pages, member_tribe_pages
 from tribalbot.src.constants import DEFAULT_TRIBE_COLOR
-from tribalbot.src.utils.tribes import TribeMemberCollection
 from tribalbot.src.utils.checks import guild_has_leaders_role
 from tribalbot.src.utils.views import (
     ApplicationPaginatorView, 
@@ -46,11 +49,8 @@ class TribeCog(Cog, description='Cog for tribe commands'):
     @app_commands.command(name='tribe-list', description="Returns a list of the server's tribes")
     @app_commands.guild_only()
     async def tribe_list(self, interaction: Interaction):
-        tribes = await get_all_guild_tribes(interaction.guild)
-        for tribe in tribes:
-            await tribe.fetch_related('members')
-        view = TribePaginatorView(owner=interaction.user, tribes=tribes)
-        await view.send_menu(interaction, tribes)
+        pages = await guild_tribe_pages(interaction.guild)
+        await TribePaginatorView.send_menu(interaction, pages)
     
     @app_commands.command(name='tribe-create', description='Creates a new tribe with you as the leader!')
     @app_commands.describe(name='The name of your tribe', 
@@ -79,18 +79,21 @@ class TribeCog(Cog, description='Cog for tribe commands'):
                 )
             kw['category'] = cat
             
-        tribes = await get_all_member_tribes(interaction.user)
-        cats = [await t.category for t in tribes]
-        
-        if category in cats:
+        category_id = kw['category'].pk if category else None
+        if await member_has_tribe_in_category(interaction.guild.id, interaction.user.id, category_id):
             return await interaction.response.send_message(
                 "You're already a member of a tribe in the selected category (or the default category)",
                 ephemeral=True
             )
+        if await tribe_name_exists(interaction.guild, name):
+            return await interaction.response.send_message(
+                f'There\'s already a tribe named "{name}", try a different name',
+                ephemeral=True
+            )
         await interaction.response.defer(ephemeral=True)
         
         tribe = await create_new_tribe(**kw)
-        guild_config: GuildConfig = await tribe.guild_config
+        guild_config: GuildConfig = await get_related(tribe, 'guild_config')
         role_id = guild_config.leaders_role
         role = interaction.guild.get_role(role_id)
         await interaction.user.add_roles(role)
@@ -119,22 +122,22 @@ class TribeCog(Cog, description='Cog for tribe commands'):
                 ephemeral=True
             )
         
-        applications = {
-            application.applicant
-            for application in
-            await get_tribe_applications(tribe)
-        }
-        
-        if interaction.user.id in applications:
+        if await has_pending_application(tribe, interaction.user.id):
             return await interaction.response.send_message(
                 'You already have an application to enter this tribe, wait for the tribe staff to accept or deny it',
                 ephemeral=True
             )
         
-        application = await create_tribe_join_application(tribe, interaction) # create an application
+        try:
+            application = await create_tribe_join_application(tribe, interaction) # create an application
+        except DuplicateApplication: # sent twice before the first one was stored
+            return await interaction.response.send_message(
+                'You already have an application to enter this tribe, wait for the tribe staff to accept or deny it',
+                ephemeral=True
+            )
         
         if not application: # it might be unsuccessful if the user already has a tribe in the given category
-            cat = await tribe.category
+            cat = await get_related(tribe, 'category')
             cat = cat.name if cat else 'Default'
             return await interaction.response.send_message(
                 f"Application error: You are already a member of a tribe in this tribe's category ({cat})",
@@ -178,19 +181,16 @@ class TribeCog(Cog, description='Cog for tribe commands'):
         if not tribe or not await can_manage_tribe(interaction, tribe): 
             return
         
-        applications = await get_tribe_applications(tribe)
-        
-        view = ApplicationPaginatorView(applications, tribe, interaction.user)
-        await interaction.response.send_message(embed=view.embeds[0], view=view, ephemeral=True)
+        view = ApplicationPaginatorView(ApplicationPages(tribe), interaction.user)
+        await interaction.response.send_message(embed=await view.current_embed(), view=view, ephemeral=True)
     
     @app_commands.command(name='my-tribes', description='Shows you the tribes you are a part of')
     @app_commands.guild_only()
     @guild_has_leaders_role()
     async def my_tribes_cmd(self, interaction: Interaction):
         
-        tribes = await get_all_member_tribes(interaction.user)
-        [await t.fetch_related("members") for t in tribes]
-        await TribePaginatorView.send_menu(interaction, tribes)
+        pages = await member_tribe_pages(interaction.user)
+        await TribePaginatorView.send_menu(interaction, pages)
         
     @app_commands.command(name='set-banner', description="Sets your tribe's banner")
     @app_commands.describe(name='The name of the target tribe')
@@ -215,7 +215,11 @@ class TribeCog(Cog, description='Cog for tribe commands'):
         if not tribe or not await can_manage_tribe(interaction, tribe): 
             return
         
-        banner = tribe.banner
+        current = await get_tribe_banner(tribe)
+        banner = { # the tribe must not change unless the user confirms
+            'description': current.description if current else '',
+            'image': current.image if current else '',
+        }
         if color:
             banner['color'] = color
         if description: 
@@ -242,10 +246,7 @@ class TribeCog(Cog, description='Cog for tribe commands'):
         
         await view.wait()
         if view.confirmed:
-            tribe.color = color
-            banner.pop('color', None)
-            tribe.banner = banner
-            await tribe.save()
+            await set_tribe_banner(tribe, **banner)
             await view.itn.response.edit_message(content='Done! changes applied', embed=None, view=view)
         else:
             await view.itn.response.edit_message(content='Changes cancelled', embed=None, view=view)
@@ -263,8 +264,13 @@ class TribeCog(Cog, description='Cog for tribe commands'):
         tribe = await get_tribe(interaction, name)
         if not tribe: return
         
-        await tribe.fetch_related('members', 'guild_config')
-        embed = tribe_banner(tribe, interaction.guild)
+        embed = tribe_banner(
+            tribe, 
+            interaction.guild, 
+            await get_tribe_banner(tribe), 
+            await get_related(tribe, 'members'), 
+            await get_guild_config(interaction.guild)
+        )
         await interaction.response.send_message(embed=embed)
     
     @app_commands.command(name='tribe-kick', description="Kicks a member out of the tribe")
@@ -282,29 +288,20 @@ class TribeCog(Cog, description='Cog for tribe commands'):
         if not tribe or not await can_manage_tribe(interaction, tribe): 
             return
 
-        await tribe.fetch_related('members')
-        
         if member.id == interaction.user.id:
             return await interaction.response.send_message(
                 "Don't kick yourself out, just exit the tribe...",
                 ephemeral=True
             )
-        elif member.id not in [m.member_id for m in tribe.members]:
+        
+        try:
+            await remove_tribe_member(tribe, member.id)
+        except ValueError:
             return await interaction.response.send_message(
                 f'{member.mention} is not a part of this tribe',
                 ephemeral=True
             )
         
-        
-        for m in tribe.members:
-            if m.member_id == member.id:
-                await m.delete()
-                break
-        if member.id == tribe.manager:
-            tribe.manager = None
-        
-        await tribe.save()
-        
         await interaction.response.send_message(
             f'Done! {member.mention} has been kicked out the tribe',
             ephemeral=True
@@ -323,11 +320,9 @@ class TribeCog(Cog, description='Cog for tribe commands'):
         member = interaction.user
         tribe = await get_tribe(interaction, name)
         if not tribe: return 
-        tribe_members = TribeMemberCollection(await tribe.members)
-        
         
         if member.id == tribe.leader:
-            result = await handle_leader_leave(tribe, members=tribe_members) # handle leader exiting tribe
+            result = await handle_leader_leave(tribe) # handle leader exiting tribe
             if result:
                 new_leader = interaction.guild.get_member(tribe.leader)
                 try:
@@ -340,16 +335,14 @@ class TribeCog(Cog, description='Cog for tribe commands'):
                     ))
                 except: pass # new leader doesn't allow dms
             
-        elif member.id in tribe_members.ids:
-            await tribe_members.remove_member(member.id)
-            if member.id == tribe.manager:
-                tribe.manager = None
         else:
-            return await interaction.response.send_message(
-                f"You are not a part of **{tribe.name}**",
-                ephemeral=True
-            )
-        await tribe.save()
+            try:
+                await remove_tribe_member(tribe, member.id)
+            except ValueError:
+                return await interaction.response.send_message(
+                    f"You are not a part of **{tribe.name}**",
+                    ephemeral=True
+                )
         await interaction.response.send_message(
                 f"Done! You are no longer a part of **{tribe.name}**",
                 ephemeral=True
@@ -382,20 +375,19 @@ class TribeCog(Cog, description='Cog for tribe commands'):
                 "You cannot be the leader and the tribe's manager, appoint someone else",
                 ephemeral=True
             )
-        members = TribeMemberCollection(await tribe.members)
-        if new_manager.id not in members.ids:
-            return await respond(
-                f'{new_manager.mention} is not a part of this tribe',
-                ephemeral=True
-            )
         elif new_manager.id == tribe.manager:
             return await respond(
                 f'{new_manager.mention} is already the manager of the tribe',
                 ephemeral=True
             )
         
-        tribe.manager = new_manager.id
-        await tribe.save()
+        try:
+            await set_tribe_manager(tribe, new_manager.id)
+        except ValueError:
+            return await respond(
+                f'{new_manager.mention} is not a part of this tribe',
+                ephemeral=True
+            )
         
         await respond(
             f"Done! {new_manager.mention} is now the tribe's manager",
@@ -435,20 +427,15 @@ class TribeCog(Cog, description='Cog for tribe commands'):
                 "You cannot target yourself with this command",
                 ephemeral=True
             )
-        members = TribeMemberCollection(await tribe.members)
-        if new_leader.id not in members.ids:
+        try:
+            await transfer_tribe_leadership(tribe, new_leader.id)
+        except ValueError:
             return await respond(
                 f'Error: {new_leader.mention} is not a part of the tribe',
                 ephemeral=True
             )
         await interaction.response.defer(ephemeral=True)
         
-        tribe.leader = new_leader.id
-        await members.remove_member(new_leader.id)
-        
-        await tribe.save()
-        await TribeMember.create(tribe=tribe, member_id=interaction.user.id)
-        
         try:
             await new_leader.send(
                 embed=Embed(
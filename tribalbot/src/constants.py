@@ -9,10 +9,32 @@ __all__ = [
     'DATABASE_URL',
     'guild_id',
     'DEFAULT_TRIBE_COLOR',
+    'MONITOR_SWEEP_INTERVAL',
+    'MONITOR_TICK_INTERVAL',
+    'MONITOR_TICK_BUDGET',
+    'MONITOR_PAGE_SIZE',
+    'GUILD_PURGE_GRACE',
+    'TRIBE_PAGE_SIZE',
+    'TRIBE_PAGE_LOOKAHEAD',
+    'APPLICATION_PAGE_SIZE',
 ]
 
 DEFAULT_TRIBE_COLOR = 16711680
 
+# the tribe monitor sweeps all guilds once per interval, spreading the work over short ticks
+MONITOR_SWEEP_INTERVAL = float(os.getenv('MONITOR_SWEEP_INTERVAL', 300))  # seconds between the start of two sweeps
+MONITOR_TICK_INTERVAL = float(os.getenv('MONITOR_TICK_INTERVAL', 10))  # seconds between ticks
+MONITOR_TICK_BUDGET = float(os.getenv('MONITOR_TICK_BUDGET', 0.5))  # seconds of work allowed per tick
+MONITOR_PAGE_SIZE = int(os.getenv('MONITOR_PAGE_SIZE', 50))  # guild configs fetched per query
+
+# seconds the data of a guild is kept after the bot is removed from it, in case it gets invited back
+GUILD_PURGE_GRACE = float(os.getenv('GUILD_PURGE_GRACE', 3600))
+
+# tribe menus load tribes (and their members) one page at a time
+TRIBE_PAGE_SIZE = int(os.getenv('TRIBE_PAGE_SIZE', 10))  # tribes fetched per query
+TRIBE_PAGE_LOOKAHEAD = int(os.getenv('TRIBE_PAGE_LOOKAHEAD', 2))  # tribes prepared ahead of the one on screen
+APPLICATION_PAGE_SIZE = int(os.getenv('APPLICATION_PAGE_SIZE', 20))  # join applications fetched per query
+
 DEV_MODE = os.getenv('DEV_MODE', False)  # defines amongs other things if commands should be synced for a single server (development server)
 if DEV_MODE:
     print('[!] Bot running in development mode')
@@ -1,17 +1,40 @@
 
 from discord import Guild, Role
-from tribalbot.src.orm.models import GuildConfig, TribeCategory
+from tribalbot.src.orm.models import GuildConfig, LogEntry, Tribe, TribeCategory, TribeJoinApplication, TribeMember, normalize_name
+from tribalbot.src.orm.helpers import delete_in_chunks
+from tribalbot.src.orm.scope import register
+from tribalbot.src.utils.cache import CacheEngine
+from tribalbot.src.utils.events import invalidation_bus, CATEGORY_CREATED, GUILD_PURGED
+
+# read-through cache of the configurations, every write to a GuildConfig must go through this module
+guild_config_cache = CacheEngine(ttl=3600, max_entries=10_000, max_weight=10_000, weigh=lambda _: 1)
 
 async def get_guild_config(guild: Guild) -> GuildConfig:
-    guild_config, _ = await GuildConfig.get_or_create(guild_id=guild.id)
-    return guild_config
+    """Returns the configuration of the guild, creating it if needed
+    Served from memory, the database is only hit on the first access after an invalidation
+    """
+    async def load() -> GuildConfig:
+        guild_config, _ = await GuildConfig.get_or_create(guild_id=guild.id)
+        return guild_config
+    
+    guild_config = await guild_config_cache.get_or_load(guild.id, load)
+    return register(guild_config)
+
+def invalidate_guild_config(guild_id: int):
+    """Drops the cached configuration of the guild, the next read reloads it"""
+    guild_config_cache.invalidate(guild_id)
+
+@invalidation_bus.subscribe(GUILD_PURGED)
+def _drop_guild_config(event: str, *, guild_id: int):
+    invalidate_guild_config(guild_id)
 
 async def create_new_category(guild: Guild, name: str) -> TribeCategory:
     guild_config = await get_guild_config(guild)
-    same_categories = await TribeCategory.filter(guild_config=guild_config, name__iexact=name)
-    if same_categories:
+    if await TribeCategory.filter(guild_config=guild_config, name_key=normalize_name(name)).exists():
         raise ValueError(f'Tribe category with name "{name}" already exists')
-    return await TribeCategory.create(guild_config=guild_config, name=name)
+    category = await TribeCategory.create(guild_config=guild_config, name=name)
+    invalidation_bus.publish(CATEGORY_CREATED, category=category)
+    return category
 
 async def set_leaders_role(guild: Guild, role: Role) -> None:
     """sets up the leaders role in the guild configurations
@@ -22,5 +45,41 @@ async def set_leaders_role(guild: Guild, role: Role) -> None:
     """
     guild_config = await get_guild_config(guild)
     guild_config.leaders_role = role.id
-    await guild_config.save()
-    
\ No newline at end of file
+    await guild_config.save(update_fields=['leaders_role'])
+    invalidate_guild_config(guild.id)
+
+async def set_banner_urls(guild: Guild, allowed: bool) -> None:
+    """sets whether tribe banners of the guild can contain urls
+
+    Args:
+        guild (Guild): the guild to alter
+        allowed (bool): the new setting
+    """
+    guild_config = await get_guild_config(guild)
+    guild_config.urls = allowed
+    await guild_config.save(update_fields=['urls'])
+    invalidate_guild_config(guild.id)
+
+async def purge_guild_data(guild_id: int) -> int:
+    """Deletes all the data of a guild in small chunks
+    Dependent rows are deleted before their parents so no deletion cascades over a big set of rows
+
+    Args:
+        guild_id (int): the id of the guild to purge
+
+    Returns:
+        int: the amount of deleted rows
+    """
+    deleted = 0
+    for queryset in (
+        TribeJoinApplication.filter(guild_id=guild_id),
+        LogEntry.filter(tribe__guild_config_id=guild_id),
+        TribeMember.filter(guild_id=guild_id),
+        Tribe.filter(guild_config_id=guild_id),
+        TribeCategory.filter(guild_config_id=guild_id),
+        GuildConfig.filter(guild_id=guild_id),
+    ):
+        deleted += await delete_in_chunks(queryset)
+    invalidation_bus.publish(GUILD_PURGED, guild_id=guild_id)
+    return deleted
+
@@ -0,0 +1,119 @@
+
+from typing import Iterable
+
+from tribalbot.src.orm.models import Tribe, TribeCategory
+from tribalbot.src.utils.events import (
+    invalidation_bus, 
+    TRIBE_CREATED, 
+    TRIBE_UPDATED, 
+    TRIBE_DELETED, 
+    CATEGORY_CREATED, 
+    GUILD_PURGED,
+)
+
+__all__ = [
+    'GuildDirectory',
+    'TribeDirectory',
+    'tribe_directory',
+]
+
+
+class GuildDirectory:
+    """In memory read model of the tribes and categories of a guild
+    Also keeps a reverse index of the tribes each user belongs to (as leader, manager or member),
+    filled on demand and evicted whenever a tribe of the user changes
+    """
+    __slots__ = ('tribe_names', 'tribes_by_pk', 'categories', 'member_tribes', 'version')
+    
+    def __init__(self):
+        self.tribe_names: dict[str, set[int]] = {} # name -> tribe pks, names are not unique in old data
+        self.tribes_by_pk: dict[int, Tribe] = {}
+        self.categories: dict[str, TribeCategory] = {} # by name
+        self.member_tribes: dict[int, frozenset[int]] = {} # user id -> tribe pks
+        self.version = 0 # increases with every eviction of the reverse index
+    
+    @property
+    def tribes(self) -> list[Tribe]:
+        return list(self.tribes_by_pk.values())
+    
+    def named(self, name: str) -> list[Tribe]:
+        """Returns every tribe with param name"""
+        return [self.tribes_by_pk[pk] for pk in self.tribe_names.get(name, ())]
+    
+    def add_tribe(self, tribe: Tribe):
+        """Adds the tribe or replaces the stored instance of the same tribe"""
+        if old := self.tribes_by_pk.get(tribe.pk):
+            self._forget_name(old)
+        self.tribe_names.setdefault(tribe.name, set()).add(tribe.pk)
+        self.tribes_by_pk[tribe.pk] = tribe
+    
+    def remove_tribe(self, tribe: Tribe):
+        if old := self.tribes_by_pk.pop(tribe.pk, None):
+            self._forget_name(old)
+    
+    def _forget_name(self, tribe: Tribe):
+        pks = self.tribe_names.get(tribe.name)
+        if pks is not None:
+            pks.discard(tribe.pk)
+            if not pks:
+                del self.tribe_names[tribe.name]
+    
+    def add_category(self, category: TribeCategory):
+        self.categories[category.name] = category
+    
+    def forget_members(self, *user_ids: int | None):
+        """Evicts the reverse index entries of the users"""
+        for user_id in user_ids:
+            self.member_tribes.pop(user_id, None)
+        self.version += 1
+
+
+class TribeDirectory:
+    """Per guild directories of tribes and categories
+    Loaded in bulk when the bot starts and kept up to date by the controllers' change events,
+    so reads by name or pk don't need the database
+    """
+    def __init__(self):
+        self._guilds: dict[int, GuildDirectory] = {}
+        self.loaded = False
+    
+    async def load(self):
+        """(Re)builds the directories of every guild with one query per model"""
+        guilds: dict[int, GuildDirectory] = {}
+        for tribe in await Tribe.all():
+            guilds.setdefault(tribe.guild_config_id, GuildDirectory()).add_tribe(tribe)
+        for category in await TribeCategory.all():
+            guilds.setdefault(category.guild_config_id, GuildDirectory()).add_category(category)
+        self._guilds = guilds
+        self.loaded = True
+    
+    def get(self, guild_id: int) -> GuildDirectory | None:
+        """Returns the directory of the guild, None if the directory hasn't been loaded"""
+        if not self.loaded:
+            return None
+        return self._guilds.setdefault(guild_id, GuildDirectory())
+    
+    def drop(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+
+
+tribe_directory = TribeDirectory()
+
+
+@invalidation_bus.subscribe(TRIBE_CREATED, TRIBE_UPDATED, TRIBE_DELETED)
+def _sync_tribe(event: str, tribe: Tribe, users: Iterable[int] = ()):
+    if directory := tribe_directory.get(tribe.guild_config_id):
+        if event == TRIBE_DELETED:
+            directory.remove_tribe(tribe)
+        else:
+            directory.add_tribe(tribe)
+        directory.forget_members(tribe.leader, tribe.manager, *users)
+
+@invalidation_bus.subscribe(CATEGORY_CREATED)
+def _sync_category(event: str, category: TribeCategory):
+    if directory := tribe_directory.get(category.guild_config_id):
+        directory.add_category(category)
+
+@invalidation_bus.subscribe(GUILD_PURGED)
+def _drop_guild(event: str, guild_id: int):
+    tribe_directory.drop(guild_id)
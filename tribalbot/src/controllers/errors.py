@@ -6,3 +6,16 @@ class BadTribeCategory(TribeBotControllerError): pass
 
 class InvalidMember(TribeBotControllerError): pass
 
+class DuplicateTribeName(TribeBotControllerError): pass
+
+class DuplicateApplication(TribeBotControllerError): pass
+
+class AlreadyTribeMember(TribeBotControllerError): pass
+
+class AmbiguousTribeName(TribeBotControllerError):
+    """Several tribes of the guild share the name, created before names were checked"""
+    def __init__(self, name: str, pks: list[int]):
+        super().__init__(f'There are {len(pks)} tribes named "{name}" (ids: {", ".join(map(str, sorted(pks)))})')
+        self.name = name
+        self.pks = pks
+
@@ -0,0 +1,28 @@
+
+from typing import AsyncIterator
+
+from tribalbot.src.orm.models import GuildConfig, MonitorCheckpoint
+from tribalbot.src.constants import MONITOR_PAGE_SIZE
+
+
+async def get_monitor_checkpoint(name: str) -> MonitorCheckpoint:
+    """Returns the persisted progress of the monitor with param name"""
+    checkpoint, _ = await MonitorCheckpoint.get_or_create(name=name)
+    return checkpoint
+
+async def guild_config_pages(after: int = 0, page_size: int = MONITOR_PAGE_SIZE) -> AsyncIterator[list[int]]:
+    """Streams the guild ids of every GuildConfig in ascending order
+    Uses keyset pagination so no more than `page_size` rows are loaded at once
+
+    Args:
+        after (int): the guild id to resume after
+        page_size (int): the amount of guild ids per page
+
+    Yields:
+        list[int]: a page of guild ids
+    """
+    while page := await GuildConfig.filter(
+        guild_id__gt=after
+    ).order_by('guild_id').limit(page_size).values_list('guild_id', flat=True):
+        yield page
+        after = page[-1]
@@ -0,0 +1,161 @@
+import asyncio
+
+from discord import Guild, Member
+from tortoise.queryset import QuerySet
+
+from tribalbot.src.orm.models import Tribe, TribeJoinApplication
+from tribalbot.src.constants import TRIBE_PAGE_SIZE, APPLICATION_PAGE_SIZE
+
+from .directory import tribe_directory
+from .tribes import get_all_member_tribes
+
+
+class TribePages:
+    """Keyset paginated access to a set of tribes ordered by pk
+    Each page is fetched with its members and banners in a single batched prefetch
+    and kept for the lifetime of the object, so paging back and forth
+    only hits the database the first time a page is seen.
+
+    Pages are located from the neighbour page that is already loaded
+    (pk greater than the last pk of the previous page, or lower than the first
+    pk of the next page), never with an OFFSET.
+    """
+    def __init__(self, query: QuerySet[Tribe], total: int, page_size: int = TRIBE_PAGE_SIZE):
+        self.query = query
+        self.total = total
+        self.page_size = page_size
+        self._pages: dict[int, list[Tribe]] = {}
+        self._loading: dict[int, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return self.total
+
+    @property
+    def page_count(self) -> int:
+        return -(-self.total // self.page_size)
+
+    def locate(self, index: int) -> tuple[int, int]:
+        """Returns the (page, offset) of the tribe at index, wrapping around the ends"""
+        return divmod(index % self.total, self.page_size)
+
+    def loaded(self, index: int) -> Tribe | None:
+        """Returns the tribe at index if its page is already loaded, None otherwise"""
+        page, offset = self.locate(index)
+        tribes = self._pages.get(page)
+        if tribes is not None and offset < len(tribes):
+            return tribes[offset]
+
+    async def get(self, index: int) -> Tribe | None:
+        """Returns the tribe at index, loading its page if needed
+        Returns None if the tribe vanished since the pages were counted"""
+        page, offset = self.locate(index)
+        tribes = await self.page(page)
+        if offset < len(tribes):
+            return tribes[offset]
+
+    def prefetch(self, index: int):
+        """Starts loading the page of the tribe at index in the background"""
+        page, _ = self.locate(index)
+        if page not in self._pages and page not in self._loading:
+            self._start(page)
+
+    async def page(self, number: int) -> list[Tribe]:
+        """Returns the tribes of page number, concurrent callers share a single load"""
+        if (tribes := self._pages.get(number)) is not None:
+            return tribes
+        task = self._loading.get(number) or self._start(number)
+        return await asyncio.shield(task)
+
+    def _start(self, number: int) -> asyncio.Task:
+        task = asyncio.create_task(self._load(number))
+        self._loading[number] = task
+        task.add_done_callback(lambda t: self._load_done(number, t))
+        return task
+
+    def _load_done(self, number: int, task: asyncio.Task):
+        self._loading.pop(number, None)
+        if not task.cancelled() and (error := task.exception()):
+            print(f'[!] Could not load tribe page {number}: {error!r}')
+
+    async def _load(self, number: int) -> list[Tribe]:
+        query = self.query.prefetch_related('members', 'banner')
+        size = self.page_size
+        if number == 0:
+            tribes = await query.order_by('id').limit(size)
+        elif previous := self._pages.get(number - 1):
+            tribes = await query.filter(id__gt=previous[-1].pk).order_by('id').limit(size)
+        elif (following := self._pages.get(number + 1)) or number == self.page_count - 1:
+            # walking backwards, either from the next page or wrapping around from the first one
+            if following:
+                query = query.filter(id__lt=following[0].pk)
+            else:
+                size = self.total - number * size
+            tribes = await query.order_by('-id').limit(size)
+            tribes.reverse()
+        else: # not reachable by stepping one tribe at a time
+            tribes = await query.order_by('id').offset(number * size).limit(size)
+        self._pages[number] = tribes
+        return tribes
+
+
+class ApplicationPages:
+    """Incremental keyset paginated access to the pending applications of a tribe
+    Applications are loaded in order of arrival, one page at a time and only
+    when the reader gets close to the end of what was already loaded.
+    Applications handled through the menu are removed from it, the following ones shift back.
+    """
+    def __init__(self, tribe: Tribe, page_size: int = APPLICATION_PAGE_SIZE):
+        self.tribe = tribe
+        self.page_size = page_size
+        self.applications: list[TribeJoinApplication] = []
+        self.exhausted = False
+        self._cursor = 0 # id of the last application loaded
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        """amount of applications loaded so far"""
+        return len(self.applications)
+
+    async def load_more(self) -> list[TribeJoinApplication]:
+        """Loads the next page of applications and returns it"""
+        async with self._lock:
+            if self.exhausted:
+                return []
+            page = await TribeJoinApplication.filter(
+                tribe_id=self.tribe.pk, id__gt=self._cursor
+            ).order_by('id').limit(self.page_size)
+            if len(page) < self.page_size:
+                self.exhausted = True
+            if page:
+                self._cursor = page[-1].pk
+                self.applications.extend(page)
+            return page
+
+    async def ensure(self, index: int) -> bool:
+        """Loads pages until the application at index is available
+        Returns False if there are not that many applications"""
+        while index >= len(self.applications) and not self.exhausted:
+            await self.load_more()
+        return index < len(self.applications)
+
+    def remove(self, application: TribeJoinApplication):
+        """Removes an application that was handled from the loaded ones"""
+        try:
+            self.applications.remove(application)
+        except ValueError: # already removed
+            pass
+
+
+async def guild_tribe_pages(guild: Guild) -> TribePages:
+    """Returns paginated access to all the tribes of a guild"""
+    query = Tribe.filter(guild_config_id=guild.id)
+    if directory := tribe_directory.get(guild.id):
+        total = len(directory.tribes_by_pk)
+    else:
+        total = await query.count()
+    return TribePages(query, total)
+
+async def member_tribe_pages(member: Member) -> TribePages:
+    """Returns paginated access to the tribes a member belongs to"""
+    pks = [tribe.pk for tribe in await get_all_member_tribes(member)]
+    return TribePages(Tribe.filter(pk__in=pks), len(pks))
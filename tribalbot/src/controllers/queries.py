@@ -0,0 +1,63 @@
+"""
+Read only fast path for the hot lookups.
+Rows are served as tuples (NamedTuple records for the ones with named columns) built straight
+from `values_list` projections, so no model instances, relation descriptors or change tracking are allocated.
+Call sites opt in when they only need a few columns and never write the rows back,
+anything that modifies a row must load the model.
+"""
+from typing import NamedTuple
+
+from tortoise.expressions import Q
+
+from tribalbot.src.orm.models import Tribe, TribeCategory, TribeMember
+
+__all__ = [
+    'TribeName',
+    'TribeStaff',
+    'CategoryName',
+    'guild_tribe_names',
+    'staff_tribe_names',
+    'guild_category_names',
+    'guild_tribe_staff',
+    'guild_memberships',
+]
+
+
+class TribeName(NamedTuple):
+    pk: int
+    name: str
+
+class TribeStaff(NamedTuple):
+    pk: int
+    leader: int
+    manager: int | None
+
+class CategoryName(NamedTuple):
+    pk: int
+    name: str
+
+
+async def guild_tribe_names(guild_id: int) -> list[TribeName]:
+    """Returns the (pk, name) of every tribe of the guild"""
+    rows = await Tribe.filter(guild_config_id=guild_id).values_list('id', 'name')
+    return list(map(TribeName._make, rows))
+
+async def staff_tribe_names(guild_id: int, user_id: int, *, leader_only: bool = False) -> list[TribeName]:
+    """Returns the (pk, name) of the tribes of the guild the user leads (or manages, unless leader_only)"""
+    staff = Q(leader=user_id) if leader_only else Q(leader=user_id) | Q(manager=user_id)
+    rows = await Tribe.filter(staff, guild_config_id=guild_id).values_list('id', 'name')
+    return list(map(TribeName._make, rows))
+
+async def guild_category_names(guild_id: int) -> list[CategoryName]:
+    """Returns the (pk, name) of every tribe category of the guild"""
+    rows = await TribeCategory.filter(guild_config_id=guild_id).values_list('id', 'name')
+    return list(map(CategoryName._make, rows))
+
+async def guild_tribe_staff(guild_id: int) -> list[TribeStaff]:
+    """Returns the (pk, leader, manager) of every tribe of the guild"""
+    rows = await Tribe.filter(guild_config_id=guild_id).values_list('id', 'leader', 'manager')
+    return list(map(TribeStaff._make, rows))
+
+async def guild_memberships(guild_id: int) -> list[tuple[int, int, int]]:
+    """Returns the (TribeMember.pk, tribe id, member id) of every tribe membership of the guild"""
+    return await TribeMember.filter(guild_id=guild_id).values_list('id', 'tribe_id', 'member_id')
@@ -1,16 +1,33 @@
 
 import asyncio
 import random
-from typing import Optional
+from collections import defaultdict
+from typing import Iterable, NamedTuple, Optional, Sequence
 
 from discord import Guild, Member, app_commands, Interaction, Embed, Color
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import Q, Subquery
+from tortoise.transactions import in_transaction
 
-from tribalbot.src.orm.models import LogEntry, Tribe, TribeCategory, TribeJoinApplication, TribeMember
+from tribalbot.src.orm.models import LogEntry, Tribe, TribeBanner, TribeCategory, TribeJoinApplication, TribeMember
+from tribalbot.src.orm.helpers import chunked, SQL_CHUNK_SIZE
+from tribalbot.src.orm.scope import get_related, scoped
 from tribalbot.src.constants import DATABASE_URL
-from tribalbot.src.utils.tribes import TribeMemberCollection
+from tribalbot.src.utils.presence import presence_index
+from tribalbot.src.utils.metrics import timed
+from tribalbot.src.utils.events import invalidation_bus, TRIBE_CREATED, TRIBE_UPDATED, TRIBE_DELETED
 
 from .configs import get_guild_config
-from .errors import BadTribeCategory, InvalidMember
+from .directory import tribe_directory
+from .queries import guild_memberships, guild_tribe_staff
+from .errors import (
+    AlreadyTribeMember, 
+    AmbiguousTribeName, 
+    BadTribeCategory, 
+    DuplicateApplication, 
+    DuplicateTribeName, 
+    InvalidMember,
+)
 
 
 async def create_new_tribe(
@@ -34,9 +51,15 @@ async def create_new_tribe(
 
     Returns:
         Tribe: the newly created tribe
+    
+    Raises:
+        DuplicateTribeName: if the guild already has a tribe with param name
     """
     author = author or leader
     
+    if await tribe_name_exists(guild, name):
+        raise DuplicateTribeName(f'There\'s already a tribe named "{name}"')
+    
     guild_config = await get_guild_config(guild)
     
     tribe = await Tribe.create(
@@ -52,6 +75,7 @@ async def create_new_tribe(
         text=f'Tribe was created with name "{tribe.name}" and id "{tribe.pk}" by user "{author}"'
     )
     
+    invalidation_bus.publish(TRIBE_CREATED, tribe=tribe)
     return tribe
 
 async def get_all_guild_tribes(guild: Guild) -> set[Tribe]:
@@ -63,22 +87,36 @@ async def get_all_guild_tribes(guild: Guild) -> set[Tribe]:
     Returns:
         set[Tribe]
     """
+    if directory := tribe_directory.get(guild.id):
+        return set(directory.tribes)
     tribes = await Tribe.filter(guild_config__guild_id=guild.id)
     return set(tribes)
 
+def _membership_tribes(guild_id: int, *user_ids: int) -> Subquery:
+    """Ids of the tribes of the guild the users are members of, answered from the members table alone"""
+    return Subquery(TribeMember.filter(guild_id=guild_id, member_id__in=user_ids).values('tribe_id'))
+
 async def query_member_in_tribes(member: Member) -> set[Tribe]:
     """Returns all the tribes a member belongs to"""
     guild = member.guild
     
-    memberships = await TribeMember.filter(member_id=member.id, tribe__guild_config__guild_id=guild.id)
-    return {await m.tribe for m in memberships}
+    return set(await Tribe.filter(id__in=_membership_tribes(guild.id, member.id)))
+
+def _member_tribes_query(guild_id: int, user_id: int):
+    """Tribes of the guild where the user is the leader, the manager or a member, as a single query"""
+    return Tribe.filter(
+        Q(leader=user_id) | Q(manager=user_id) | Q(id__in=_membership_tribes(guild_id, user_id)),
+        guild_config_id=guild_id,
+    )
     
 async def get_all_member_tribes(member: Member) -> set[Tribe]:
     """Returns a set of tribes a given member belongs to.
     It will only return tribes from the member's object guild.
     The following criteria are considered:
         - The member is a leader
+        - The member is the manager
         - The member is part of the tribe's members
+    Answered from the guild directory's reverse index, a miss is filled with a single JOIN query
 
     Args:
         member (discord.Member): the target member
@@ -86,19 +124,22 @@ async def get_all_member_tribes(member: Member) -> set[Tribe]:
     Returns:
         set[Tribe]
     """
-    # guild_config = await get_guild_config(member.guild)
     guild = member.guild
+    directory = tribe_directory.get(guild.id)
+    if not directory:
+        return set(await _member_tribes_query(guild.id, member.id))
     
-    tribes = set(
-        tribe for result in 
-        await asyncio.gather(
-            Tribe.filter(guild_config__guild_id=guild.id, leader=member.id),
-            query_member_in_tribes(member)
-        )
-        for tribe in result
-    )
+    tribe_ids = directory.member_tribes.get(member.id)
+    if tribe_ids is None:
+        version = directory.version
+        tribe_ids = frozenset(await _member_tribes_query(guild.id, member.id).values_list('id', flat=True))
+        if version == directory.version: # no tribe changed while querying
+            directory.member_tribes[member.id] = tribe_ids
     
-    return tribes
+    return {
+        tribe for pk in tribe_ids
+        if (tribe := directory.tribes_by_pk.get(pk))
+    }
     
 
 async def get_tribe_category(guild: Guild, name: str) -> TribeCategory | None:
@@ -111,9 +152,23 @@ async def get_tribe_category(guild: Guild, name: str) -> TribeCategory | None:
     Returns:
         TribeCategory | None: Returns None if no tribe was found
     """
+    if directory := tribe_directory.get(guild.id):
+        return directory.categories.get(name)
     return await TribeCategory.get_or_none(guild_config_id=guild.id, name=name)
 
 
+async def get_tribe_by_pk(guild: Guild, pk: int) -> Tribe | None:
+    """Returns the tribe of param guild with param pk"""
+    if directory := tribe_directory.get(guild.id):
+        return directory.tribes_by_pk.get(pk)
+    return await Tribe.get_or_none(pk=pk, guild_config_id=guild.id)
+
+async def tribe_name_exists(guild: Guild, name: str) -> bool:
+    """Returns True if the guild has a tribe with param name (case sensitive)"""
+    if directory := tribe_directory.get(guild.id):
+        return name in directory.tribe_names
+    return await Tribe.filter(guild_config_id=guild.id, name=name).exists()
+
 async def get_tribe_by_name(guild: Guild, name: str) -> Tribe | None:
     """Returns a Tribe for param guild with param name (case sensitivie)
 
@@ -123,15 +178,92 @@ async def get_tribe_by_name(guild: Guild, name: str) -> Tribe | None:
 
     Returns:
         Tribe | None: the tribe if found
+    
+    Raises:
+        AmbiguousTribeName: if more than one tribe has the name
     """
+    if directory := tribe_directory.get(guild.id):
+        tribes = directory.named(name)
+    else:
+        tribes = await Tribe.filter(guild_config_id=guild.id, name=name)
+    if len(tribes) > 1:
+        raise AmbiguousTribeName(name, [tribe.pk for tribe in tribes])
+    return tribes[0] if tribes else None
 
-    tribe = await Tribe.get_or_none(guild_config_id=guild.id, name=name)
-    return tribe
+async def get_tribe_banner(tribe: Tribe) -> TribeBanner | None:
+    """Returns the banner of the tribe, None if it was never set"""
+    return await TribeBanner.get_or_none(tribe_id=tribe.pk)
+
+async def set_tribe_banner(tribe: Tribe, description: str, image: str, *, color: int | None = None) -> TribeBanner:
+    """Creates or replaces the banner of the tribe, and its color if supplied, in a single transaction
+
+    Args:
+        tribe (Tribe): the target tribe
+        description (str): the description of the banner
+        image (str): the url of the banner image
+        color (int | None): the new color of the tribe, left unchanged if None
+
+    Returns:
+        TribeBanner: the banner of the tribe
+    """
+    async with in_transaction():
+        banner, _ = await TribeBanner.update_or_create(
+            {'description': description, 'image': image}, 
+            tribe_id=tribe.pk
+        )
+        if color is not None:
+            await Tribe.filter(pk=tribe.pk).update(color=color)
+    
+    if color is not None:
+        tribe.color = color
+    invalidation_bus.publish(TRIBE_UPDATED, tribe=tribe)
+    return banner
+
+async def member_has_tribe_in_category(guild_id: int, user_id: int, category_id: int | None) -> bool:
+    """Returns True if the user already leads or belongs to a tribe of the category
+    Answered with a single EXISTS query
+
+    Args:
+        guild_id (int): the guild of the tribes
+        user_id (int): the target user
+        category_id (int | None): the category, None for the default category
+    """
+    return await scoped(
+        ('tribe-in-category', guild_id, user_id, category_id),
+        Tribe.filter(
+            Q(leader=user_id) | Q(id__in=_membership_tribes(guild_id, user_id)),
+            guild_config_id=guild_id,
+            category_id=category_id,
+        ).exists
+    )
+
+def _category_leaders(guild_id: int, user_ids: Iterable[int], category_id: int | None):
+    """Ids of the users that lead a tribe of the category"""
+    return Tribe.filter(
+        guild_config_id=guild_id, 
+        category_id=category_id, 
+        leader__in=user_ids
+    ).values_list('leader', flat=True)
+
+def _category_members(guild_id: int, user_ids: Iterable[int], category_id: int | None):
+    """Ids of the users that belong to a tribe of the category, answered from the members table alone"""
+    category_tribes = Subquery(Tribe.filter(guild_config_id=guild_id, category_id=category_id).values('id'))
+    return TribeMember.filter(
+        guild_id=guild_id, 
+        member_id__in=user_ids, 
+        tribe_id__in=category_tribes
+    ).values_list('member_id', flat=True)
 
-async def get_member_categories(member: Member) -> set[TribeCategory]:
-    tribes = await get_all_member_tribes(member)
-    cats = {await tribe.category for tribe in tribes}
-    return cats
+async def members_with_tribe_in_category(guild_id: int, user_ids: Iterable[int], category_id: int | None) -> set[int]:
+    """Batch version of `member_has_tribe_in_category`
+    Returns the ids of the users that already lead or belong to a tribe of the category
+    with two queries per chunk of user ids, neither of them joins the members table
+    """
+    found = set()
+    for chunk in chunked(set(user_ids)):
+        found.update(await _category_leaders(guild_id, chunk, category_id))
+        found.update(await _category_members(guild_id, chunk, category_id))
+    return found
 
 async def create_tribe_join_application(tribe: Tribe, interaction: Interaction) -> TribeJoinApplication | None:
     """Creates a join application in the target tribe for the applicant (interaction.user)
@@ -139,73 +271,142 @@ async def create_tribe_join_application(tribe: Tribe, interaction: Interaction)
     
     returns:
         TribeJoinApplication | None: the application of the member to the target tribe
+    
+    Raises:
+        DuplicateApplication: if the member already applied to the tribe (a concurrent request)
     """
     applicant: Member = interaction.user
     
-    cat = await tribe.category
-    member_cats = await get_member_categories(applicant)
-    if cat in member_cats:
+    if await member_has_tribe_in_category(tribe.guild_config_id, applicant.id, tribe.category_id):
         return
-    else:
-        application =  await TribeJoinApplication.create(tribe=tribe, applicant=applicant.id)
-        return application
+    try:
+        return await TribeJoinApplication.create(
+            tribe=tribe, guild_id=tribe.guild_config_id, applicant=applicant.id
+        )
+    except IntegrityError:
+        raise DuplicateApplication('Member already has an application to enter the tribe')
     
 async def get_tribe_applications(tribe: Tribe) -> list[TribeJoinApplication]:
     """Returns all current tribe applications"""
     return await tribe.join_applications
 
+async def has_pending_application(tribe: Tribe, user_id: int) -> bool:
+    """Returns True if the user already has an application to enter the tribe"""
+    return await scoped(
+        ('pending-application', tribe.pk, user_id),
+        TribeJoinApplication.filter(tribe_id=tribe.pk, applicant=user_id).exists
+    )
+
 async def accept_applicant(applicant: Member, application: TribeJoinApplication):
     """
     Allows a member into a tribe. 
     Only works under these conditions:
         - the member doesn't have other tribes in the same category
     
+    Raises:
+        BadTribeCategory: if the member belongs to another tribe of the category
+        AlreadyTribeMember: if the member was accepted concurrently, the application is deleted anyway
     """
-    tribe = await application.tribe
+    directory = tribe_directory.get(applicant.guild.id)
+    tribe = directory and directory.tribes_by_pk.get(application.tribe_id)
+    if tribe is None:
+        tribe = await get_related(application, 'tribe')
     
-    cats = await get_member_categories(applicant)
-    if tribe.category not in cats:
-        await TribeMember.create(tribe=tribe, member_id=applicant.id)
-        await application.delete()
-    else:
+    if await member_has_tribe_in_category(tribe.guild_config_id, applicant.id, tribe.category_id):
         raise BadTribeCategory('Member is already a part of another tribe in this category')
+    try:
+        async with in_transaction():
+            await TribeMember.create(tribe=tribe, guild_id=tribe.guild_config_id, member_id=applicant.id)
+            await application.delete()
+    except IntegrityError:
+        await TribeJoinApplication.filter(id=application.pk).delete()
+        raise AlreadyTribeMember('Member is already a part of the tribe')
+    invalidation_bus.publish(TRIBE_UPDATED, tribe=tribe, users=(applicant.id,))
+
+
+class ApplicationReview(NamedTuple):
+    """Outcome of reviewing every pending application of a tribe at once"""
+    applicants: set[int] # ids of the applicants that were accepted or denied
+    skipped: set[int] # ids of the applicants left pending (category conflicts or no longer in the guild)
+    members: set[int] = set() # ids of the applicants that already were members, their applications are deleted
+
+
+async def accept_all_applications(tribe: Tribe, guild: Guild) -> ApplicationReview:
+    """Accepts every pending application of the tribe whose applicant is still in the guild
+    and doesn't belong to another tribe of the same category.
+    The category conflicts of all the applicants are resolved with one query per chunk,
+    members are inserted with bulk_create and the accepted applications deleted together,
+    all within a single transaction.
+    Applicants that already are members of the tribe (accepted concurrently) only lose their application
+    """
+    async with in_transaction():
+        applications = await TribeJoinApplication.filter(tribe_id=tribe.pk).values_list('id', 'applicant')
+        applicants = {applicant for _, applicant in applications}
+        members = set()
+        for chunk in chunked(applicants):
+            members.update(
+                await TribeMember.filter(tribe_id=tribe.pk, member_id__in=chunk).values_list('member_id', flat=True)
+            )
+        present = presence_index.get(guild).present(applicants - members)
+        accepted = present - await members_with_tribe_in_category(guild.id, present, tribe.category_id)
+        
+        await TribeMember.bulk_create([
+            TribeMember(tribe_id=tribe.pk, guild_id=guild.id, member_id=member_id)
+            for member_id in accepted
+        ], ignore_conflicts=True) # a member accepted since the read above is already in
+        for chunk in chunked(pk for pk, applicant in applications if applicant in accepted or applicant in members):
+            await TribeJoinApplication.filter(id__in=chunk).delete()
+    
+    if accepted:
+        invalidation_bus.publish(TRIBE_UPDATED, tribe=tribe, users=tuple(accepted))
+    return ApplicationReview(accepted, applicants - accepted - members, members)
+
+async def deny_all_applications(tribe: Tribe) -> ApplicationReview:
+    """Deletes every pending application of the tribe with a single statement"""
+    async with in_transaction():
+        applications = await TribeJoinApplication.filter(tribe_id=tribe.pk).values_list('id', 'applicant')
+        if applications:
+            # applications are never updated, anything newer than the last one read is left pending
+            last = max(pk for pk, _ in applications)
+            await TribeJoinApplication.filter(tribe_id=tribe.pk, id__lte=last).delete()
+    return ApplicationReview({applicant for _, applicant in applications}, set())
 
 
 async def parse_tribe_members(tribe: Tribe, guild: Guild) -> set[Member]:
     """Returns a set of discord.Member from the tribe's members
     Only returns those members that are currently part of the server"""
+    present = presence_index.get(guild).present(tm.member_id for tm in await get_related(tribe, 'members'))
     return {
-        member for tm in await tribe.members
-        if (member := guild.get_member(tm.member_id))
+        member for member_id in present
+        if (member := guild.get_member(member_id))
     }
 
-async def prune_tribe_members(tribe: Tribe, guild: Guild) -> set[int]:
-    """remove the tribe members that are no longer part of the guild"""
-    members = await tribe.members
-    to_prune = []
-    prunned = set()
-    for tm in members:
-        if not guild.get_member(tm.member_id):
-            to_prune.append(tm.delete())
-            prunned.add(tm.member_id)
-    await asyncio.gather(*to_prune)
-    return prunned
-    
-
-async def handle_leader_leave(
-    tribe: Tribe, 
-    *, 
-    members: TribeMemberCollection | None = None, 
-    new_leader: int | None = None
-) -> bool:
+async def prune_guild_memberships(guild_id: int, member_ids: Iterable[int]) -> int:
+    """Deletes the memberships of the users with param ids from every tribe of the guild
+    with a single DELETE per chunk of ids, on the members table alone.
+    Leaders and managers are not touched, use `reconcile_guild_tribes` to handle them
+
+    Returns:
+        int: the amount of deleted memberships
+    """
+    deleted = 0
+    for chunk in chunked(member_ids):
+        deleted += await TribeMember.filter(guild_id=guild_id, member_id__in=chunk).delete()
+    return deleted
+    
+
+@timed('tribe.leader_leave')
+async def handle_leader_leave(tribe: Tribe, *, new_leader: int | None = None) -> bool:
     """This handles a tribe leader that is leaving the tribe
     Works if the leader was forced to leave by an admin or 
     if the leader exits the tribe without disbanding or 
-    appointing a successor
+    appointing a successor.
+    The succession runs in a single transaction: one DELETE of the successor's 
+    membership and one UPDATE of the tribe (or the DELETE of the tribe).
+    The members are only read when there's no manager to take the charge
     
     Args:
         tribe (Tribe): the target tribe
-        members (TribeMembersCollection | None): a collection of the tribe members if any
         new_leader (int | None): an optional new leader id
             - if the new_leader id is a member from the tribe 
                 it will be removed as a member
@@ -218,31 +419,293 @@ async def handle_leader_leave(
             True: if the tribe still exists
             False: if the tribe was deleted
     """
-    members = members or TribeMemberCollection(await tribe.members)
-    if new_leader:
-        if new_leader in members.ids: # the new leader is part of the tribe members
-            await members.remove_member(new_leader) # we first remove the leader from the members
+    old_staff = tribe.staff
+    manager = tribe.manager
+    async with in_transaction():
+        if new_leader:
+            # a no-op if the new leader wasn't a member of the tribe
+            await TribeMember.filter(tribe_id=tribe.pk, member_id=new_leader).delete()
+        elif manager and await TribeMember.filter(tribe_id=tribe.pk, member_id=manager).delete():
+            new_leader = manager # the manager takes the charge, no need to look at the members
+        else:
+            member_ids = await TribeMember.filter(tribe_id=tribe.pk).values_list('member_id', flat=True)
+            if new_leader := pick_new_leader(tribe, member_ids):
+                await TribeMember.filter(tribe_id=tribe.pk, member_id=new_leader).delete()
+            else: # there are no more users in this tribe, we delete it
+                await tribe.delete()
+        
+        if new_leader:
+            if new_leader == manager:
+                manager = None
+            await Tribe.filter(pk=tribe.pk).update(leader=new_leader, manager=manager)
+    
+    if not new_leader:
+        invalidation_bus.publish(TRIBE_DELETED, tribe=tribe, users=old_staff)
+        return False
+    
+    tribe.leader, tribe.manager = new_leader, manager
+    invalidation_bus.publish(TRIBE_UPDATED, tribe=tribe, users=old_staff)
+    return True
+
+
+@timed('tribe.remove_member')
+async def remove_tribe_member(tribe: Tribe, member_id: int):
+    """Removes a regular member from the tribe, if the member is the manager the post is cleared
+    Runs a single DELETE, plus an UPDATE for the manager, in one transaction
+
+    Args:
+        tribe (Tribe): the target tribe
+        member_id (int): the id of the member to remove
+    
+    Raises:
+        ValueError: if the member is not part of the tribe members
+    """
+    async with in_transaction():
+        if not await TribeMember.filter(tribe_id=tribe.pk, member_id=member_id).delete():
+            raise ValueError(f'member with id "{member_id}" is not a part of the tribe')
+        if member_id == tribe.manager:
+            await Tribe.filter(pk=tribe.pk).update(manager=None)
+    
+    if member_id == tribe.manager:
+        tribe.manager = None
+    invalidation_bus.publish(TRIBE_UPDATED, tribe=tribe, users=(member_id,))
+
+
+@timed('tribe.transfer_leadership')
+async def transfer_tribe_leadership(tribe: Tribe, new_leader: int):
+    """Appoints a tribe member as the new leader, the old leader becomes a regular member
+    The membership of the new leader is handed over to the old leader in place,
+    so the transfer is one UPDATE of the membership and one UPDATE of the tribe in a single transaction
+
+    Args:
+        tribe (Tribe): the target tribe
+        new_leader (int): the id of the new leader, must be a member of the tribe
+    
+    Raises:
+        ValueError: if the new leader is not part of the tribe members
+    """
+    old_leader = tribe.leader
+    manager = None if new_leader == tribe.manager else tribe.manager
+    async with in_transaction():
+        swapped = await TribeMember.filter(
+            tribe_id=tribe.pk, member_id=new_leader
+        ).update(member_id=old_leader)
+        if not swapped:
+            raise ValueError(f'member with id "{new_leader}" is not a part of the tribe')
+        await Tribe.filter(pk=tribe.pk).update(leader=new_leader, manager=manager)
+    
+    tribe.leader, tribe.manager = new_leader, manager
+    invalidation_bus.publish(TRIBE_UPDATED, tribe=tribe, users=(old_leader,))
+
+
+@timed('tribe.set_manager')
+async def set_tribe_manager(tribe: Tribe, manager: int):
+    """Appoints the manager of the tribe, replacing the previous one if any
+    Checks the membership and updates the tribe in a single transaction
+    
+    Raises:
+        ValueError: if the manager is not part of the tribe members
+    """
+    old_manager = tribe.manager
+    async with in_transaction():
+        if not await TribeMember.filter(tribe_id=tribe.pk, member_id=manager).exists():
+            raise ValueError(f'member with id "{manager}" is not a part of the tribe')
+        await Tribe.filter(pk=tribe.pk).update(manager=manager)
+    tribe.manager = manager
+    invalidation_bus.publish(TRIBE_UPDATED, tribe=tribe, users=(old_manager,))
+
+
+@timed('tribe.disband')
+async def disband_tribe(tribe: Tribe):
+    """Deletes the tribe along with its members, applications and log entries
+    the related rows are removed by the database (ON DELETE CASCADE) within the same statement"""
+    members = await TribeMember.filter(tribe_id=tribe.pk).values_list('member_id', flat=True)
+    await tribe.delete()
+    invalidation_bus.publish(TRIBE_DELETED, tribe=tribe, users=members)
+
+
+def pick_new_leader(tribe: Tribe, member_ids: Sequence[int]) -> int | None:
+    """Selects the successor of a leaving tribe leader
+    The manager takes the charge if there's one, if not, a random member is selected
+
+    Args:
+        tribe (Tribe): the target tribe
+        member_ids (Sequence[int]): the ids of the remaining tribe members
+
+    Returns:
+        int | None: the id of the new leader, None if there's no one left to lead the tribe
+    """
+    if tribe.manager and tribe.manager in member_ids:
+        return tribe.manager
+    elif member_ids:
+        return random.choice(member_ids)
+
+
+# reconciliations of a guild read the tribes, plan the successions in memory and then apply them,
+# two of them interleaved could promote different members of the same tribe
+_reconcile_locks: defaultdict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+class TribeReconciliation(NamedTuple):
+    """Outcome of removing the users that left a guild from its tribes"""
+    pruned: int # amount of deleted tribe memberships
+    new_leaders: list[Tribe] # tribes that got a new leader
+    disbanded: list[Tribe] # tribes that were deleted because no members were left
+    queries: int # amount of statements sent to the database
+
+
+async def reconcile_departed_members(
+    tribes: Iterable[Tribe],
+    memberships: Iterable[tuple[int, int, int]],
+    departed: set[int],
+) -> TribeReconciliation:
+    """Removes the departed users from the tribes using set based statements
+    All the changes are computed in memory and then applied in a single transaction:
+        - one DELETE for the memberships of departed users across every tribe of the guild
+        - one DELETE for the memberships of the promoted members
+        - one DELETE for the tribes that were left without members
+        - one UPDATE for the leader and manager changes of the remaining tribes
+    Leaders are replaced following the rules of `handle_leader_leave`
+
+    Args:
+        tribes (Iterable[Tribe]): the tribes to reconcile, they must belong to a single guild 
+            and include every tribe the departed users are part of
+        memberships (Iterable[tuple[int, int, int]]): 
+            (TribeMember.pk, tribe id, member id) of the members of the tribes
+        departed (set[int]): ids of the users that are no longer part of the guild
+
+    Returns:
+        TribeReconciliation
+    """
+    tribes = list(tribes)
+    promoted: list[int] = [] # TribeMember primary keys of the members that became leaders
+    remaining: dict[int, dict[int, int]] = {} # tribe id -> {member id -> TribeMember.pk}
+    pruned_from: dict[int, set[int]] = {} # tribe id -> departed member ids
+    for row_id, tribe_id, member_id in memberships:
+        if member_id in departed:
+            pruned_from.setdefault(tribe_id, set()).add(member_id)
+        else:
+            remaining.setdefault(tribe_id, {})[member_id] = row_id
+    
+    changed, new_leaders, disbanded = [], [], []
+    affected: dict[int, set[int]] = {} # tribe id -> departed users and old staff, for the change events
+    for tribe in tribes:
+        affected[tribe.pk] = {*tribe.staff, *pruned_from.get(tribe.pk, ())}
+        staff_changed = False
+        if tribe.manager in departed:
+            tribe.manager = None
+            staff_changed = True
+        
+        if tribe.leader in departed:
+            members = remaining.get(tribe.pk, {})
+            new_leader = pick_new_leader(tribe, list(members))
+            if new_leader is None: # there's no one left in the tribe
+                disbanded.append(tribe)
+                continue
             if new_leader == tribe.manager:
                 tribe.manager = None
-                
-    else:
-        if members.ids: # there are members in this tribe
-            if tribe.manager: # there's a manager so let's pick them
-                new_leader = tribe.manager
-                tribe.manager = None
-                await members.remove_member(new_leader)
-            else: # there isn't a manager so let's pick at random from the tribe members
-                new_leader = random.choice(members.ids)
-                await members.remove_member(new_leader)
-            
-        else: # there are no more users in this tribe, we delete it and return False
-            await tribe.delete()
-            return False
+            tribe.leader = new_leader
+            promoted.append(members[new_leader]) # the new leader is no longer a regular member
+            new_leaders.append(tribe)
+            staff_changed = True
         
-    # if we haven't returned then we have a new leader 
-    tribe.leader = new_leader
-    await tribe.save() # all other changes have already been made
+        if staff_changed:
+            changed.append(tribe)
     
-    return True    
-
+    queries = pruned = 0
+    async with in_transaction():
+        if pruned_from:
+            departed_members = set().union(*pruned_from.values())
+            pruned = await prune_guild_memberships(tribes[0].guild_config_id, departed_members)
+            queries += -(-len(departed_members) // SQL_CHUNK_SIZE)
+        for chunk in chunked(promoted):
+            await TribeMember.filter(id__in=chunk).delete()
+            queries += 1
+        for chunk in chunked(tribe.pk for tribe in disbanded):
+            await Tribe.filter(id__in=chunk).delete()
+            queries += 1
+        for chunk in chunked(changed):
+            await Tribe.bulk_update(chunk, fields=('leader', 'manager'))
+            queries += 1
+    
+    for tribe in disbanded:
+        invalidation_bus.publish(TRIBE_DELETED, tribe=tribe, users=affected.pop(tribe.pk))
+    touched = pruned_from.keys() | {tribe.pk for tribe in changed}
+    for tribe in tribes:
+        if tribe.pk in affected and tribe.pk in touched:
+            invalidation_bus.publish(TRIBE_UPDATED, tribe=tribe, users=affected[tribe.pk])
     
+    return TribeReconciliation(pruned, new_leaders, disbanded, queries)
+
+
+async def reconcile_guild_tribes(guild: Guild) -> TribeReconciliation:
+    """Removes from every tribe of the guild the users that are no longer part of it
+    The staff of the tribes and their memberships are read as tuples with two queries and 
+    the departed users are computed in a single pass against the guild's presence index.
+    Tribe models are only loaded for the tribes that have departed users
+
+    Args:
+        guild (Guild): the target guild, its members must be already chunked
+
+    Returns:
+        TribeReconciliation
+    """
+    async with _reconcile_locks[guild.id]: # the plan must be computed and applied without a concurrent one
+        staff = await guild_tribe_staff(guild.id)
+        if not staff:
+            return TribeReconciliation(0, [], [], 1)
+        
+        memberships = await guild_memberships(guild.id)
+        
+        users = {member_id for *_, member_id in memberships}
+        for _, leader, manager in staff:
+            users.add(leader)
+            users.add(manager)
+        users.discard(None)
+        departed = presence_index.get(guild).missing(users)
+        
+        if not departed:
+            return TribeReconciliation(0, [], [], 2)
+        
+        affected = {pk for pk, leader, manager in staff if leader in departed or manager in departed}
+        affected.update(tribe_id for _, tribe_id, member_id in memberships if member_id in departed)
+        tribes, queries = [], 2
+        for chunk in chunked(affected):
+            tribes += await Tribe.filter(id__in=chunk)
+            queries += 1
+        result = await reconcile_departed_members(tribes, memberships, departed)
+        return result._replace(queries=result.queries + queries)
+
+
+async def remove_departed_members(guild: Guild, departed: set[int]) -> TribeReconciliation:
+    """Removes a batch of users that left the guild from all of its tribes
+    The affected tribes are resolved with one query per chunk of departed ids 
+    and their memberships with another one
+
+    Args:
+        guild (Guild): the guild the users left
+        departed (set[int]): ids of the users that left
+
+    Returns:
+        TribeReconciliation
+    """
+    async with _reconcile_locks[guild.id]:
+        tribes: dict[int, Tribe] = {}
+        queries = 0
+        for chunk in chunked(departed):
+            for tribe in await Tribe.filter(
+                Q(leader__in=chunk) | Q(manager__in=chunk) | Q(id__in=_membership_tribes(guild.id, *chunk)),
+                guild_config_id=guild.id,
+            ):
+                tribes[tribe.pk] = tribe
+            queries += 1
+        if not tribes:
+            return TribeReconciliation(0, [], [], queries)
+        
+        memberships = []
+        for chunk in chunked(tribes):
+            memberships += await TribeMember.filter(tribe_id__in=chunk).values_list('id', 'tribe_id', 'member_id')
+            queries += 1
+        
+        result = await reconcile_departed_members(tribes.values(), memberships, departed)
+        return result._replace(queries=result.queries + queries)
@@ -2,6 +2,8 @@ from tortoise import Tortoise
 
 from tribalbot.src.constants import DATABASE_URL
 
+from .helpers import sync_name_keys
+
 __all__ = ['init_db', 'close_db']
 
 TORTOISE_ORM = {
@@ -21,6 +23,8 @@ async def init_db():
     print('[!] initializing database')
     await Tortoise.init(config=TORTOISE_ORM)
     await Tortoise.generate_schemas()
+    if fixed := await sync_name_keys():
+        print(f'[+] fixed the name keys of {fixed} tribe categories')
 
 async def close_db():
     print('[-] closing the database')
@@ -0,0 +1,62 @@
+import asyncio
+from itertools import islice
+from typing import Iterable, Iterator, TypeVar
+
+from tortoise.exceptions import IntegrityError
+from tortoise.queryset import QuerySet
+
+from .models import TribeCategory, normalize_name
+
+__all__ = [
+    'chunked',
+    'delete_in_chunks',
+    'sync_name_keys',
+    'SQL_CHUNK_SIZE',
+]
+
+T = TypeVar('T')
+
+SQL_CHUNK_SIZE = 500 # keeps "IN (...)" clauses below the sqlite variable limit
+
+
+def chunked(iterable: Iterable[T], size: int = SQL_CHUNK_SIZE) -> Iterator[list[T]]:
+    """Yields lists of at most `size` items from the iterable"""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+async def delete_in_chunks(queryset: QuerySet, size: int = SQL_CHUNK_SIZE) -> int:
+    """Deletes the rows matched by the queryset `size` rows at a time
+    Yields to the event loop between chunks so big deletions don't block the bot
+    
+    Returns:
+        int: the amount of deleted rows
+    """
+    model = queryset.model
+    deleted = 0
+    while pks := await queryset.limit(size).values_list(model._meta.pk_attr, flat=True):
+        deleted += await model.filter(pk__in=pks).delete()
+        await asyncio.sleep(0)
+    return deleted
+
+
+async def sync_name_keys() -> int:
+    """Rewrites the name keys of the tribe categories that don't match `normalize_name`
+    The SQL backfills of the migrations can't reproduce it on every database 
+    (SQLite's LOWER only folds ASCII, SQL's TRIM only strips spaces), so the keys are checked on startup.
+    Categories whose fixed key collides with another one are reported and must be merged by hand
+    
+    Returns:
+        int: the amount of fixed keys
+    """
+    fixed = 0
+    for pk, guild_id, name, name_key in await TribeCategory.all().values_list('id', 'guild_config_id', 'name', 'name_key'):
+        if name_key == normalize_name(name):
+            continue
+        try:
+            await TribeCategory.filter(id=pk).update(name_key=normalize_name(name))
+            fixed += 1
+        except IntegrityError:
+            print(f'[!] The category "{name}" of the guild {guild_id} has the name of another one, merge them by hand')
+    return fixed
@@ -1,8 +1,6 @@
 from tortoise import fields
 from tortoise.models import Model
 
-from functools import partial
-
 from tribalbot.src.constants import DEFAULT_TRIBE_COLOR
 
 from .mixins import *
@@ -15,9 +13,15 @@ __all__ = [
     'Tribe',
     'TribeJoinApplication',
     'TribeMember',
+    'TribeBanner',
+    'MonitorCheckpoint',
+    'normalize_name',
 ]
 
-_default_banner = partial(dict.copy, {'description': '', 'image': ''})
+def normalize_name(name: str) -> str:
+    """Returns the key used for case insensitive name lookups
+    Unicode aware, unlike the SQL backfills of the migrations, see `sync_name_keys`"""
+    return name.strip().lower()
 
 
 class GuildConfig(Model):
@@ -60,34 +64,47 @@ class TribeCategory(Model):
     """
     guild_config = fields.ForeignKeyField('models.GuildConfig', related_name='categories', on_delete=fields.CASCADE)
     name = fields.CharField(max_length=30)
+    name_key = fields.CharField(max_length=30) # normalized name, kept by `save`, allows indexed case insensitive lookups
     tribes: fields.ReverseRelation['Tribe']
     
     class Meta:
         table = "tribe_categories"
+        unique_together = (('guild_config', 'name_key'),)
+    
+    async def save(self, *args, **kwargs) -> None:
+        self.name_key = normalize_name(self.name)
+        await super().save(*args, **kwargs)
 
 
 class TribeJoinApplication(CreatedMixin, Model):
     tribe: 'Tribe' = fields.ForeignKeyField('models.Tribe', related_name='join_applications', on_delete=fields.CASCADE)
     applicant = fields.IntField() # applicant id
+    guild_id = fields.IntField() # copy of tribe.guild_config_id, set by the controllers
     # created = fields.DatetimeField(auto_now_add=True)
     
     class Meta:
         table = 'tribe_join_applications'
+        unique_together = (('tribe', 'applicant'),) # one pending application per user and tribe
+        indexes = (('guild_id', 'applicant'),)
 
 class TribeMember(Model):
     member_id = fields.IntField()
     tribe: 'Tribe' = fields.ForeignKeyField('models.Tribe',
                                             related_name='members',
                                             on_delete=fields.CASCADE)
+    guild_id = fields.IntField() # copy of tribe.guild_config_id, set by the controllers
+    
+    class Meta:
+        unique_together = (('tribe', 'member_id'),)
+        indexes = (('guild_id', 'member_id'),) # a user's memberships in a guild without joining the tribes
 
 class Tribe(CreatedMixin, Model):
     guild_config: GuildConfig = fields.ForeignKeyField('models.GuildConfig', 
                                                        related_name='tribes', 
                                                        on_delete=fields.CASCADE)
     name = fields.CharField(max_length=30)
-    leader = fields.IntField()
-    manager = fields.IntField(null=True)
-    banner = fields.JSONField(default=_default_banner)
+    leader = fields.IntField(index=True)
+    manager = fields.IntField(null=True, index=True)
     # created = fields.DatetimeField(auto_now_add=True)
     category: TribeCategory | None = fields.ForeignKeyField('models.TribeCategory', 
                                                             related_name='tribes', 
@@ -98,9 +115,11 @@ class Tribe(CreatedMixin, Model):
     members: fields.ReverseRelation[TribeMember]
     log_entries: fields.ReverseRelation[LogEntry]
     join_applications: fields.ReverseRelation[TribeJoinApplication]
+    banner: fields.BackwardOneToOneRelation['TribeBanner']
     
     class Meta:
         table = "tribes"
+        indexes = (('guild_config', 'name'),) # not unique, tribe names were never enforced to be unique
     
     @property
     def staff(self) -> tuple[int]:
@@ -113,4 +132,25 @@ class Tribe(CreatedMixin, Model):
     def __repr__(self) -> str:
         return self.__str__()
 
-    
\ No newline at end of file
+
+class TribeBanner(Model):
+    """Banner of a tribe, kept apart from the tribe so loading tribes doesn't load banners.
+    Tribes without a banner don't have a row"""
+    tribe: Tribe = fields.OneToOneField('models.Tribe', related_name='banner', on_delete=fields.CASCADE)
+    description = fields.TextField(default='')
+    image = fields.TextField(default='')
+    
+    class Meta:
+        table = "tribe_banners"
+
+
+class MonitorCheckpoint(Model):
+    """Progress of a periodic sweep over the guild configurations
+    Persisted so a restarted bot resumes the sweep where it stopped
+    """
+    name = fields.CharField(max_length=30, pk=True)
+    cursor = fields.BigIntField(null=True) # last swept guild id, None if there's no sweep in progress
+    sweep_started = fields.DatetimeField(null=True)
+    
+    class Meta:
+        table = 'monitor_checkpoints'
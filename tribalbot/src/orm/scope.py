@@ -0,0 +1,144 @@
+"""
+Interaction scoped unit of work.
+Every interaction runs in its own task. The scope opened when it starts keeps an identity map
+of the rows loaded while handling it and the results of its read queries,
+so a single command never fetches the same row, relation or query twice.
+Outside of a scope (loops, gateway events) everything goes straight to the database.
+"""
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+from tortoise.fields.relational import (
+    BackwardFKRelation, 
+    BackwardOneToOneRelation, 
+    ForeignKeyFieldInstance, 
+    OneToOneFieldInstance,
+)
+from tortoise.models import Model
+from tortoise.queryset import QuerySet
+
+from tribalbot.src.utils.events import (
+    invalidation_bus,
+    TRIBE_CREATED,
+    TRIBE_UPDATED,
+    TRIBE_DELETED,
+    CATEGORY_CREATED,
+    GUILD_PURGED,
+)
+
+__all__ = [
+    'UnitOfWork',
+    'open_scope',
+    'current_scope',
+    'identity',
+    'register',
+    'scoped',
+    'get_related',
+]
+
+M = TypeVar('M', bound=Model)
+T = TypeVar('T')
+
+
+class UnitOfWork:
+    """Identity map and query memo shared by everything that runs for one interaction"""
+    __slots__ = ('identities', 'results', 'loads', 'hits')
+
+    def __init__(self):
+        self.identities: dict[tuple[type[Model], Any], Model] = {}
+        self.results: dict[Hashable, Any] = {}
+        self.loads = 0 # queries that went to the database
+        self.hits = 0 # queries answered from the scope
+
+    def identity(self, model: type[M], pk: Any) -> Optional[M]:
+        return self.identities.get((model, pk))
+
+    def register(self, instance: M) -> M:
+        """Adds the instance to the identity map
+        Returns the instance already mapped to the same row if there was one"""
+        return self.identities.setdefault((type(instance), instance.pk), instance)
+
+    async def memo(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        if key in self.results:
+            self.hits += 1
+            return self.results[key]
+        self.loads += 1
+        result = self.results[key] = await loader()
+        return result
+
+    def invalidate(self):
+        """Forgets the query results, called after any write so later reads see it"""
+        self.results.clear()
+
+
+_scope: ContextVar[Optional[UnitOfWork]] = ContextVar('unit_of_work', default=None)
+
+def open_scope() -> UnitOfWork:
+    """Starts a new scope for the current task (and the tasks it creates)"""
+    scope = UnitOfWork()
+    _scope.set(scope)
+    return scope
+
+def current_scope() -> Optional[UnitOfWork]:
+    return _scope.get()
+
+def identity(model: type[M], pk: Any) -> Optional[M]:
+    """Returns the instance of the row if it was already loaded in the current scope"""
+    scope = _scope.get()
+    return scope.identity(model, pk) if scope else None
+
+def register(instance: M) -> M:
+    """Adds the instance to the identity map of the current scope, if any"""
+    scope = _scope.get()
+    return scope.register(instance) if scope else instance
+
+async def scoped(key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+    """Returns the result of the loader, running it at most once per scope for param key"""
+    scope = _scope.get()
+    if scope is None:
+        return await loader()
+    return await scope.memo(key, loader)
+
+def _reverse_query(instance: Model, field: BackwardFKRelation) -> QuerySet:
+    """A new query for the rows of a reverse relation, the relation of the instance is left untouched"""
+    key = getattr(instance, field.to_field_instance.model_field_name)
+    return field.related_model.filter(**{field.relation_field: key})
+
+async def get_related(instance: Model, name: str) -> Any:
+    """Returns the related object (or list of objects) of the instance for relation `name`
+    Foreign keys are resolved from the identity map when the row was already loaded,
+    reverse relations are queried at most once per scope.
+    Reverse relations are returned as a new list every time since callers may modify it,
+    and read with a new query so the instance, which may be shared (see `TribeDirectory`), never keeps the rows.
+    """
+    scope = _scope.get()
+    field = instance._meta.fields_map[name]
+    if isinstance(field, BackwardFKRelation) and not isinstance(field, BackwardOneToOneRelation):
+        related = _reverse_query(instance, field)
+    else:
+        related = getattr(instance, name)
+    
+    if scope is None:
+        return await related
+
+    if isinstance(field, (ForeignKeyFieldInstance, OneToOneFieldInstance)):
+        pk = getattr(instance, field.source_field)
+        if pk is None:
+            return None
+        if identity := scope.identity(field.related_model, pk):
+            scope.hits += 1
+            return identity
+        scope.loads += 1
+        return scope.register(await related)
+
+    async def load():
+        return [scope.register(obj) for obj in await related]
+
+    return list(await scope.memo((type(instance), instance.pk, name), load))
+
+
+@invalidation_bus.subscribe(TRIBE_CREATED, TRIBE_UPDATED, TRIBE_DELETED, CATEGORY_CREATED, GUILD_PURGED)
+def _invalidate_scope(event: str, **_):
+    # writes publish from the task that performed them, which is the one holding the scope
+    if scope := _scope.get():
+        scope.invalidate()
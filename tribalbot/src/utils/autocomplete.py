@@ -1,12 +1,14 @@
-import asyncio
 from typing import Iterable
 
 from discord import Interaction, app_commands
 from discord.app_commands import Choice
 from tribalbot.src.controllers.tribes import get_all_member_tribes
+from tribalbot.src.controllers.directory import tribe_directory
+from tribalbot.src.controllers.queries import CategoryName, TribeName, guild_category_names, guild_tribe_names, staff_tribe_names
 
 from tribalbot.src.orm.models import TribeCategory, Tribe
-from .cache import cached_model_autocomplete
+from .cache import autocomplete_cache, cached_model_autocomplete
+from .events import invalidation_bus, TRIBE_CREATED, TRIBE_UPDATED, TRIBE_DELETED, CATEGORY_CREATED, GUILD_PURGED
 
 __all__ = [
     'autocomplete_categories',
@@ -15,14 +17,14 @@ __all__ = [
     'autocomplete_manageable_tribes',
 ]
 
-def _choices_from_tribes(tribes: Iterable[Tribe]) -> list[Choice]:
+def _choices_from_tribes(tribes: Iterable[Tribe | TribeName]) -> list[Choice]:
     """Returns a list of choices from a tribe iterable"""
     return [
         Choice(name=tribe.name, value=tribe.name)
         for tribe in tribes
     ]
 
-def _choices_from_categories(categories: Iterable[TribeCategory]) -> list[Choice]:
+def _choices_from_categories(categories: Iterable[TribeCategory | CategoryName]) -> list[Choice]:
     return [
         Choice(name=cat.name, value=cat.name)
         for cat in categories
@@ -32,12 +34,39 @@ def _guild_n_user_filter(interaction: Interaction) -> tuple[int, int]:
     """returns a tuple with the interaction guild and user ids"""
     return interaction.guild.id, interaction.user.id
 
-@cached_model_autocomplete('categories', _choices_from_categories)
+_user_caches = ('user-tribes', 'manageable-tribes', 'leader-tribes')
+
+@invalidation_bus.subscribe(TRIBE_CREATED, TRIBE_UPDATED, TRIBE_DELETED)
+def _evict_tribe_autocompletes(event: str, tribe: Tribe, users: Iterable[int] = ()):
+    """Evicts the cached autocompletes affected by a change in a tribe
+    The guild's list only changes when a tribe is created or deleted, while the per user lists
+    change for the current staff of the tribe and the users passed by the controller
+    """
+    guild_id = tribe.guild_config_id
+    if event != TRIBE_UPDATED:
+        autocomplete_cache.invalidate(('tribes', guild_id))
+    for user in {tribe.leader, tribe.manager, *users}:
+        if user:
+            for name in _user_caches:
+                autocomplete_cache.invalidate((name, (guild_id, user)))
+
+@invalidation_bus.subscribe(CATEGORY_CREATED)
+def _evict_category_autocompletes(event: str, category: TribeCategory):
+    autocomplete_cache.invalidate(('categories', category.guild_config_id))
+
+@invalidation_bus.subscribe(GUILD_PURGED)
+def _evict_guild_autocompletes(event: str, guild_id: int):
+    autocomplete_cache.invalidate(('categories', guild_id))
+    autocomplete_cache.invalidate(('tribes', guild_id))
+
+@cached_model_autocomplete('categories', _choices_from_categories, serve_stale=True)
 async def autocomplete_categories(interaction: Interaction, current: str) -> list[Choice]:
     """Autocomplete function for categories
     """
     guild = interaction.guild
-    cats = await TribeCategory.filter(guild_config_id=guild.id)
+    if directory := tribe_directory.get(guild.id):
+        return directory.categories.values()
+    cats = await guild_category_names(guild.id)
     return cats
 
 @cached_model_autocomplete(
@@ -51,12 +80,13 @@ async def autocomplete_user_tribes(interaction: Interaction, current: str) -> li
     tribes = await get_all_member_tribes(user)
     return tribes
     
-@cached_model_autocomplete('tribes', _choices_from_tribes)
+@cached_model_autocomplete('tribes', _choices_from_tribes, serve_stale=True)
 async def autocomplete_guild_tribes(interaction: Interaction, current: str) -> list[Choice]:
     """Autocomplete for guild tribes"""
     guild = interaction.guild
-
-    tribes = await Tribe.filter(guild_config_id=guild.id)
+    if directory := tribe_directory.get(guild.id):
+        return directory.tribes
+    tribes = await guild_tribe_names(guild.id)
     return tribes
 
 @cached_model_autocomplete(
@@ -68,19 +98,12 @@ async def autocomplete_manageable_tribes(interaction: Interaction, current: str)
     """Auto complete for tribes where the user is a leader or manager"""
     guild = interaction.guild
     user = interaction.user
-    coro1 = Tribe.filter(guild_config_id=guild.id, leader=user.id)
-    coro2 = Tribe.filter(guild_config_id=guild.id, manager=user.id)
-    tribes = set(
-        tribe for sublist in
-        await asyncio.gather(coro1, coro2)
-        for tribe in sublist
-    )
-    
+    tribes = await staff_tribe_names(guild.id, user.id)
     return tribes
 
 @cached_model_autocomplete('leader-tribes', _choices_from_tribes, keyf=_guild_n_user_filter)
 async def autocomplete_leader_tribes(interaction: Interaction, current: str) -> list[Choice]:
     """autocomplete for tribes quere the user is a leader of the tribe"""
-    tribes = set(await Tribe.filter(guild_config_id=interaction.guild.id, leader=interaction.user.id))
+    tribes = await staff_tribe_names(interaction.guild.id, interaction.user.id, leader_only=True)
     return tribes
     
@@ -1,75 +1,356 @@
 
 import asyncio
+import traceback
+from bisect import bisect_left
+from collections import OrderedDict
 from functools import wraps
-from datetime import datetime, timedelta
-from typing import Any, Callable, Hashable
+from time import monotonic
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Sized
 
 from discord import Interaction
 from discord.app_commands import Choice
-from discord.ext import tasks
 
 from tortoise.models import Model
 
-# TODO: change for named tuple
+__all__ = [
+    'CacheEntry',
+    'CacheEngine',
+    'PrefixIndex',
+    'KeystrokeTracker',
+    'autocomplete_cache',
+    'autocomplete_keystrokes',
+    'cached_model_autocomplete',
+]
+
+MAX_CHOICES = 25 # discord doesn't accept more autocomplete choices
+
+
 class CacheEntry:
-    def __init__(self, result: set[Model] | None = None): 
-        self.dt = datetime.utcnow()
-        self.result = result or set()
+    __slots__ = ('result', 'expires', 'weight')
+    
+    def __init__(self, result: Any, ttl: float, weight: int):
+        self.result = result
+        self.expires = monotonic() + ttl
+        self.weight = weight
     
     @property
     def is_expired(self) -> bool:
-        return self.dt + timedelta(minutes=2) < datetime.utcnow()
+        return self.expires <= monotonic()
+    
+    def is_stale_for(self, stale_ttl: float) -> bool:
+        """True if the entry expired less than `stale_ttl` seconds ago"""
+        return self.expires <= monotonic() < self.expires + stale_ttl
 
 
-autocomplete_global_cache = {}
+def _report_failure(task: asyncio.Task):
+    """prints the exception of a background task that nobody awaits"""
+    if not task.cancelled() and (error := task.exception()):
+        traceback.print_exception(error)
 
-@tasks.loop(seconds=60)
-async def clear_autocomplete_cache():
-    to_del = []
-    for name in autocomplete_global_cache:
-        for k, v in autocomplete_global_cache[name].items():
-            v: CacheEntry
-            if v.is_expired:
-                to_del.append((name, k))
-    for k1,k2 in to_del:
-        del autocomplete_global_cache[k1][k2]
+
+class CacheEngine:
+    """In memory cache bounded by amount of entries and total weight
+    The least recently used entries are evicted when a bound is exceeded and 
+    expired entries are dropped when they're accessed, so no sweeping is needed.
+    Concurrent misses of the same key share a single load (see `get_or_load`)
+    """
+    def __init__(
+        self, 
+        *, 
+        ttl: float, 
+        stale_ttl: float = 0,
+        max_entries: int, 
+        max_weight: int,
+        weigh: Callable[[Any], int] = lambda result: len(result) if isinstance(result, Sized) else 1,
+    ):
+        """
+        Args:
+            ttl (float): default seconds an entry lives
+            stale_ttl (float): seconds an expired entry can still be served while it's refreshed
+            max_entries (int): max amount of entries
+            max_weight (int): max sum of the weight of the entries
+            weigh (callable -> int): returns the weight of a result, by default its length (rows)
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.weigh = weigh
+        self.weight = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        self.coalesced = self.stale_hits = self.abandoned = 0
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._loading: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not entry.is_expired
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached result for the key or default if it's missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        elif entry.is_expired:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.result
+    
+    async def get_or_load(
+        self, 
+        key: Hashable, 
+        loader: Callable[[], Awaitable[Any]], 
+        *, 
+        ttl: float | None = None,
+        serve_stale: bool = False,
+    ) -> Any:
+        """Returns the cached result for the key, loading it on a miss
+        Concurrent misses of the same key await a single call to the loader (single-flight).
+        A load is never cancelled, if every caller awaiting it goes away it still fills the cache
+        for the next one (usually the next keystroke of the same user)
+
+        Args:
+            key (hashable): the key of the entry
+            loader (callable -> awaitable): loads the result when it's not cached
+            ttl (float | None): seconds the loaded result lives, defaults to the engine's ttl
+            serve_stale (bool): if True an entry that expired less than `stale_ttl` seconds ago 
+                is returned right away while it's refreshed in the background
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if not entry.is_expired:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.result
+            elif serve_stale and entry.is_stale_for(self.stale_ttl):
+                self.stale_hits += 1
+                task = self._load(key, loader, ttl)
+                self._waiters[task] += 1 # nobody awaits a background refresh, it's not abandoned
+                task.add_done_callback(_report_failure)
+                return entry.result
+            self._remove(key)
+            self.expirations += 1
+        
+        self.misses += 1
+        task = self._load(key, loader, ttl)
+        self._waiters[task] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task not in self._waiters: # the load already finished (or the cache was cleared)
+                raise
+            self._waiters[task] -= 1
+            if not self._waiters[task] and not task.done(): # the load keeps running, only its callers left
+                task.add_done_callback(_report_failure) # nobody will re-raise its failure
+                self.abandoned += 1
+            raise
+    
+    def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: float | None) -> asyncio.Task:
+        """Returns the task loading the key, starting it if there's none in flight"""
+        task = self._loading.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+        
+        task = self._loading[key] = asyncio.create_task(self._fill(key, loader, ttl))
+        self._waiters[task] = 0
+        task.add_done_callback(lambda t: self._load_done(key, t))
+        return task
+    
+    async def _fill(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: float | None) -> Any:
+        result = await loader()
+        if self._loading.get(key) is asyncio.current_task(): # the key wasn't invalidated while loading
+            self.set(key, result, ttl)
+        return result
+    
+    def _load_done(self, key: Hashable, task: asyncio.Task):
+        if self._loading.get(key) is task:
+            del self._loading[key]
+        self._waiters.pop(task, None)
+        if not task.cancelled():
+            task.exception() # marks a failure as retrieved, the waiters (if any) re-raise it
+    
+    def set(self, key: Hashable, result: Any, ttl: float | None = None):
+        """Stores the result under key and evicts the least recently used entries if needed"""
+        self._remove(key)
+        entry = CacheEntry(result, self.ttl if ttl is None else ttl, self.weigh(result))
+        self._entries[key] = entry
+        self.weight += entry.weight
+        
+        while self._entries and (len(self._entries) > self.max_entries or self.weight > self.max_weight):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+    
+    def invalidate(self, key: Hashable) -> bool:
+        """Drops the entry for key, returns True if there was one
+        A load of the key that is in flight won't store its (now outdated) result
+        """
+        self._loading.pop(key, None)
+        return self._remove(key) is not None
+    
+    def clear(self):
+        """Drops every entry, the loads in flight won't store their results"""
+        self._entries.clear()
+        self._loading.clear()
+        self._waiters.clear()
+        self.weight = 0
+    
+    def _remove(self, key: Hashable) -> CacheEntry | None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.weight -= entry.weight
+        return entry
     
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'weight': self.weight,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'coalesced': self.coalesced,
+            'stale_hits': self.stale_hits,
+            'abandoned': self.abandoned,
+        }
+    
+    @property
+    def loads_saved(self) -> int:
+        """loads that didn't reach the database because they joined one in flight"""
+        return self.coalesced
+
+
+class KeystrokeTracker:
+    """Tracks the in-flight autocomplete request of each slot (guild, user, command, option)
+    Discord sends a request per keystroke but only shows the answer to the last one,
+    so a newer request supersedes (cancels) the previous one of the same slot.
+    Only the request is cancelled, the cache load it was awaiting runs to completion
+    and the newer request joins it
+    """
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.superseded = 0
+    
+    async def run(self, slot: Hashable, coro: Awaitable[Any]) -> Any | None:
+        """Runs the coroutine as the current request of the slot
+        
+        Returns:
+            the result of the coroutine or None if a newer request superseded it
+        """
+        task = asyncio.ensure_future(coro)
+        # the new request is scheduled before the previous one is cancelled, 
+        # so it can join the load the previous one started instead of repeating it
+        previous = self._inflight.get(slot)
+        self._inflight[slot] = task
+        if previous is not None and not previous.done():
+            previous.cancel()
+            self.superseded += 1
+        
+        try:
+            await asyncio.wait((task,))
+        except asyncio.CancelledError: # the request itself was cancelled
+            task.cancel()
+            raise
+        finally:
+            if self._inflight.get(slot) is task:
+                del self._inflight[slot]
+        
+        return None if task.cancelled() else task.result()
+
+
+class PrefixIndex:
+    """Prebuilt choices sorted by their normalized (casefolded) name
+    A prefix search is a binary search plus a walk over the matches, 
+    so a lookup takes O(log n + k) and always returns the choices in the same order
+    """
+    __slots__ = ('_keys', '_choices')
+    
+    def __init__(
+        self, 
+        items: Iterable[Model], 
+        choice_factory: Callable[[Iterable[Model]], list[Choice]], 
+        attr: str = 'name'
+    ):
+        """
+        Args:
+            items (Iterable[Model]): the items to index
+            choice_factory (callable -> list[Choice]): outputs a choice per item, in the same order
+            attr (str): the attribute of the items to index
+        """
+        entries = sorted(((getattr(item, attr, '') or '').casefold(), i, item) for i, item in enumerate(items))
+        self._keys = [key for key, *_ in entries]
+        self._choices = choice_factory([item for *_, item in entries])
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def search(self, prefix: str, limit: int = MAX_CHOICES) -> list[Choice]:
+        """Returns up to `limit` choices whose name starts with the prefix (case insensitive)"""
+        prefix = prefix.casefold()
+        keys = self._keys
+        start = bisect_left(keys, prefix)
+        end = start
+        stop = min(len(keys), start + limit)
+        while end < stop and keys[end].startswith(prefix):
+            end += 1
+        return self._choices[start:end]
+
+
+# entries are evicted by the controllers' change events, so they can live long
+autocomplete_cache = CacheEngine(ttl=1800, stale_ttl=600, max_entries=10_000, max_weight=1_000_000)
+autocomplete_keystrokes = KeystrokeTracker()
+
+
 def cached_model_autocomplete(
     name: str, 
-    choice_factory: Callable[[set[Model]], list[Choice]],
+    choice_factory: Callable[[Iterable[Model]], list[Choice]],
     *,
     filter_by: str = 'name',
-    keyf: Callable[[Interaction], Hashable] = lambda i: i.guild.id
+    keyf: Callable[[Interaction], Hashable] = lambda i: i.guild.id,
+    ttl: float | None = None,
+    serve_stale: bool = False,
 ):
     """decorator for autocomplete functions that make calls to the database
 
     Args:
         name (str): name under which the function will be cached
-        choice_factory (callable -> list[Choice]): a callable that outputs the actual list of choices
+        choice_factory (callable -> list[Choice]): a callable that outputs a choice per item, keeping their order
         filter_by (str): the attribute name to filter by the data
-            It will be compared to the current autocomplete value
+            It's indexed and compared (case insensitive) to the current autocomplete value
         keyf (callable -> hashable): 
             a function that takes a single argument (interaction) and returns a hashable 
             to store the returned result
+        ttl (float | None): seconds the results are cached, defaults to the ttl of the cache engine
+        serve_stale (bool): return recently expired results while they're refreshed in the background
     Decorates:
         A coroutine that returns a set of Model types (like Tribe)
     """
     def wrapper(coro):
         @wraps(coro)
         async def autocomplete(interaction: Interaction, current: str) -> list[Choice]:
-            key = keyf(interaction)
+            async def load() -> PrefixIndex:
+                return PrefixIndex(await coro(interaction, current), choice_factory, filter_by)
+            
+            async def search() -> list[Choice]:
+                index: PrefixIndex = await autocomplete_cache.get_or_load(
+                    (name, keyf(interaction)), load, ttl=ttl, serve_stale=serve_stale
+                )
+                return index.search(current)
             
-            cache: CacheEntry = autocomplete_global_cache.setdefault(name, {}).setdefault(key, CacheEntry())
-            if cache.result and not cache.is_expired:
-                data =  cache.result
-            else:
-                data = await coro(interaction, current)
-                autocomplete_global_cache[name][key] = CacheEntry(data)
-                
-            return choice_factory({
-                item for item in data
-                if getattr(item, filter_by, '').startswith(current)
-            })
+            command = interaction.command.qualified_name if interaction.command else None
+            slot = (interaction.guild_id, interaction.user.id, command, name)
+            return await autocomplete_keystrokes.run(slot, search()) or []
             
         return autocomplete
     return wrapper
@@ -0,0 +1,47 @@
+
+import traceback
+from typing import Any, Callable
+
+__all__ = [
+    'EventBus',
+    'invalidation_bus',
+    'TRIBE_CREATED',
+    'TRIBE_UPDATED',
+    'TRIBE_DELETED',
+    'CATEGORY_CREATED',
+    'GUILD_PURGED',
+]
+
+# Events published by the controllers after a write
+TRIBE_CREATED = 'tribe-created' # payload: tribe (Tribe), users (Iterable[int])
+TRIBE_UPDATED = 'tribe-updated' # payload: tribe (Tribe), users (Iterable[int])
+TRIBE_DELETED = 'tribe-deleted' # payload: tribe (Tribe), users (Iterable[int])
+CATEGORY_CREATED = 'category-created' # payload: category (TribeCategory)
+GUILD_PURGED = 'guild-purged' # payload: guild_id (int)
+
+
+class EventBus:
+    """Synchronous in-process publish/subscribe
+    Handlers run in subscription order right when the event is published
+    """
+    def __init__(self):
+        self._handlers: dict[str, list[Callable[..., Any]]] = {}
+    
+    def subscribe(self, *events: str):
+        """decorator that subscribes the decorated function to the events"""
+        def wrapper(handler: Callable[..., Any]):
+            for event in events:
+                self._handlers.setdefault(event, []).append(handler)
+            return handler
+        return wrapper
+    
+    def publish(self, event: str, **payload):
+        """Calls every handler of the event with the payload as keyword arguments"""
+        for handler in self._handlers.get(event, ()):
+            try:
+                handler(event, **payload)
+            except Exception: # a broken handler must not break the write that published the event
+                traceback.print_exc()
+
+
+invalidation_bus = EventBus()
@@ -0,0 +1,67 @@
+from functools import wraps
+from time import perf_counter
+from typing import Awaitable, Callable, TypeVar
+
+__all__ = [
+    'LatencyRecorder',
+    'operation_latency',
+    'timed',
+]
+
+F = TypeVar('F', bound=Callable[..., Awaitable])
+
+
+class LatencyStats:
+    __slots__ = ('count', 'total', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class LatencyRecorder:
+    """Keeps the amount, mean and max latency of named operations since the last report"""
+    def __init__(self):
+        self._stats: dict[str, LatencyStats] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._stats)
+
+    def record(self, name: str, seconds: float):
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = LatencyStats()
+        stats.count += 1
+        stats.total += seconds
+        stats.max = max(stats.max, seconds)
+
+    def report(self, *, reset: bool = True) -> str:
+        """Returns one line per operation, optionally starting a new period"""
+        lines = [
+            f'{name}: {stats.count} ops, mean {stats.mean * 1000:.2f}ms, max {stats.max * 1000:.2f}ms'
+            for name, stats in sorted(self._stats.items())
+        ]
+        if reset:
+            self._stats.clear()
+        return '\n'.join(lines)
+
+
+operation_latency = LatencyRecorder()
+
+def timed(name: str, recorder: LatencyRecorder = operation_latency):
+    """Decorator that records the latency of every call of the coroutine function, failed ones included"""
+    def decorator(func: F) -> F:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                recorder.record(name, perf_counter() - start)
+        return wrapper
+    return decorator
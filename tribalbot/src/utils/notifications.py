@@ -0,0 +1,28 @@
+from discord import Embed, HTTPException, Member
+
+from tribalbot.src.utils.queues import CoalescingQueue
+
+__all__ = [
+    'dm_queue',
+    'queue_dm',
+]
+
+
+async def _send_direct_messages(user: Member, embeds: list[Embed]):
+    for embed in embeds:
+        try:
+            await user.send(embed=embed)
+        except HTTPException: # user has disabled dms or blocked the bot
+            pass
+
+
+# direct messages are sent in the background so commands don't wait on (or fail because of) them
+# embeds are not hashable, so the batches are lists
+dm_queue: CoalescingQueue[Member, Embed] = CoalescingQueue(
+    _send_direct_messages, delay=1.0, max_delay=5.0, unique=False
+)
+
+def queue_dm(user: Member | None, embed: Embed):
+    """Queues a direct message for the user, does nothing if the user is None"""
+    if user is not None:
+        dm_queue.push(user, embed)
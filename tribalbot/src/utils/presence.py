@@ -0,0 +1,109 @@
+
+from array import array
+from bisect import bisect_left
+from typing import Iterable
+
+from discord import Guild, Member
+
+__all__ = [
+    'GuildPresence',
+    'PresenceIndex',
+    'presence_index',
+]
+
+
+class GuildPresence:
+    """Sorted array with the ids of the members of a guild
+    Takes 8 bytes per member and answers membership queries with a binary search
+    """
+    __slots__ = ('_ids',)
+    
+    def __init__(self, ids: Iterable[int] = ()):
+        self._ids = array('Q', sorted(set(ids)))
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __contains__(self, member_id: int) -> bool:
+        ids = self._ids
+        i = bisect_left(ids, member_id)
+        return i < len(ids) and ids[i] == member_id
+    
+    def add(self, member_id: int):
+        ids = self._ids
+        i = bisect_left(ids, member_id)
+        if i == len(ids) or ids[i] != member_id:
+            ids.insert(i, member_id)
+    
+    def discard(self, member_id: int):
+        ids = self._ids
+        i = bisect_left(ids, member_id)
+        if i < len(ids) and ids[i] == member_id:
+            del ids[i]
+    
+    def present(self, member_ids: Iterable[int]) -> set[int]:
+        """Returns the ids that belong to members of the guild
+        The ids are sorted and intersected with the index in a single forward pass
+        """
+        ids = self._ids
+        size = len(ids)
+        found = set()
+        lo = 0
+        for member_id in sorted(set(member_ids)):
+            lo = bisect_left(ids, member_id, lo)
+            if lo == size:
+                break
+            if ids[lo] == member_id:
+                found.add(member_id)
+        return found
+    
+    def missing(self, member_ids: Iterable[int]) -> set[int]:
+        """Returns the ids that don't belong to members of the guild"""
+        member_ids = set(member_ids)
+        return member_ids - self.present(member_ids)
+
+
+class PresenceIndex:
+    """Keeps a GuildPresence per guild, built from the member cache and updated from gateway events"""
+    def __init__(self):
+        self._guilds: dict[int, GuildPresence] = {}
+        self._built: dict[int, tuple[int | None, bool]] = {} # guild id -> (member_count, chunked) the index matches
+    
+    def get(self, guild: Guild) -> GuildPresence:
+        """Returns the presence index of the guild, building it from the member cache if needed
+        The index is rebuilt once when the members of the guild finish chunking and when the guild's 
+        member count changed without a member event (the bot was disconnected), never on every call
+        """
+        presence = self._guilds.get(guild.id)
+        if presence is not None and self._built[guild.id] != (guild.member_count, guild.chunked):
+            presence = None
+        if presence is None:
+            presence = self._guilds[guild.id] = GuildPresence(member.id for member in guild.members)
+            self._built[guild.id] = (guild.member_count, guild.chunked)
+        return presence
+    
+    def member_joined(self, member: Member):
+        if (presence := self._guilds.get(member.guild.id)) is not None:
+            presence.add(member.id)
+            self._seen(member.guild)
+    
+    def member_left(self, member: Member):
+        if (presence := self._guilds.get(member.guild.id)) is not None:
+            presence.discard(member.id)
+            self._seen(member.guild)
+    
+    def _seen(self, guild: Guild):
+        """the change of the member count was applied by an event, no rebuild is needed"""
+        _, chunked = self._built[guild.id]
+        self._built[guild.id] = (guild.member_count, chunked)
+    
+    def drop(self, guild_id: int):
+        self._guilds.pop(guild_id, None)
+        self._built.pop(guild_id, None)
+    
+    def clear(self):
+        self._guilds.clear()
+        self._built.clear()
+
+
+presence_index = PresenceIndex()
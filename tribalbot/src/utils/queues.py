@@ -0,0 +1,80 @@
+
+import asyncio
+import traceback
+from time import monotonic
+from typing import Awaitable, Callable, Collection, Generic, Hashable, TypeVar
+
+__all__ = [
+    'CoalescingQueue',
+]
+
+K = TypeVar('K', bound=Hashable)
+T = TypeVar('T')
+
+
+class CoalescingQueue(Generic[K, T]):
+    """Groups the items pushed under the same key and hands them over in batches
+    A batch is flushed once no item has been pushed to its key for `delay` seconds 
+    or `max_delay` seconds after its first item, whichever comes first.
+    Items pushed while a batch is being flushed start a new batch.
+    """
+    def __init__(
+        self, 
+        flush: Callable[[K, Collection[T]], Awaitable[None]], 
+        *, 
+        delay: float = 2.0, 
+        max_delay: float = 10.0,
+        unique: bool = True,
+    ):
+        """
+        Args:
+            flush (callable): coroutine function that receives the key and the batch of items
+            delay (float): seconds without new items before the batch is flushed
+            max_delay (float): max seconds an item can wait in the queue
+            unique (bool): batches are sets of (hashable) items if True, 
+                lists that keep every item in order if False
+        """
+        self._flush = flush
+        self.delay = delay
+        self.max_delay = max_delay
+        self.unique = unique
+        self._batches: dict[K, set[T] | list[T]] = {}
+        self._last_push: dict[K, float] = {}
+        self._tasks: dict[K, asyncio.Task] = {}
+    
+    def __len__(self) -> int:
+        """amount of pending items"""
+        return sum(len(batch) for batch in self._batches.values())
+    
+    def push(self, key: K, item: T):
+        """Adds the item to the current batch of the key"""
+        if self.unique:
+            self._batches.setdefault(key, set()).add(item)
+        else:
+            self._batches.setdefault(key, []).append(item)
+        self._last_push[key] = monotonic()
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._wait_and_flush(key))
+    
+    async def _wait_and_flush(self, key: K):
+        first_push = monotonic()
+        while (wait := min(self._last_push[key] + self.delay, first_push + self.max_delay) - monotonic()) > 0:
+            await asyncio.sleep(wait)
+        await self._flush_key(key)
+    
+    async def _flush_key(self, key: K):
+        batch = self._batches.pop(key, None)
+        self._last_push.pop(key, None)
+        self._tasks.pop(key, None)
+        if not batch:
+            return
+        try:
+            await self._flush(key, batch)
+        except Exception: # a failing batch must not stop the following ones
+            traceback.print_exc()
+    
+    async def flush_all(self):
+        """Cancels the pending timers and flushes every batch right away"""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*(self._flush_key(key) for key in list(self._batches)))
@@ -1,11 +1,15 @@
+from array import array
+from typing import Iterable, Iterator, KeysView
 
 from discord import Embed, Color, Member, Guild
 
-from tribalbot.src.orm.models import Tribe, TribeMember
+from tribalbot.src.orm.models import GuildConfig, Tribe, TribeBanner, TribeMember
 from tribalbot.src.utils.misc import contains_urls
+from tribalbot.src.utils.presence import presence_index
 
 def get_tribe_embed(tribe: Tribe, guild: Guild) -> Embed:
-    """Outputs an embed describing the tribe and its members"""
+    """Outputs an embed describing the tribe and its members
+    The members and the banner of the tribe must be prefetched"""
     embed = Embed(
         title=tribe.name,
         color=tribe.color,
@@ -16,34 +20,43 @@ def get_tribe_embed(tribe: Tribe, guild: Guild) -> Embed:
     
     if tribe.manager:
         embed.add_field(name='Manager', value=f'{guild.get_member(tribe.manager) or tribe.manager}', inline=False)
+    presence = presence_index.get(guild)
     members = ''
     for tm in tribe.members:
         mid = tm.member_id
-        m = guild.get_member(mid) or mid
+        m = mid in presence and guild.get_member(mid)
         members += f'{m or mid}\n'
     if members:
         embed.add_field(name='Members', value=members or 'None yet')
 
-    if img := tribe.banner.get('image'):
-        embed.set_thumbnail(url=img)
+    if tribe.banner and tribe.banner.image:
+        embed.set_thumbnail(url=tribe.banner.image)
     
     embed.set_footer(text=f'id: {tribe.pk}')
     
     return embed
 
 
-def tribe_banner(tribe: Tribe, guild: Guild):
+def tribe_banner(
+    tribe: Tribe, 
+    guild: Guild, 
+    banner: TribeBanner | None, 
+    members: Iterable[TribeMember], 
+    guild_config: GuildConfig
+) -> Embed:
+    """Outputs the banner embed of the tribe
+    The related rows are passed in so the tribe instance, which may be shared, is never modified"""
     embed = Embed(
         title=tribe.name,
         color=tribe.color,
-        description=tribe.banner.get('description') or 'description empty'
+        description=banner and banner.description or 'description empty'
     )
     
-    if contains_urls(embed.description) and tribe.guild_config.urls is False:
+    if contains_urls(embed.description) and guild_config.urls is False:
         embed.description = 'Guild Settings disallow urls which the banner description contains. Talk to the server admins.'
     
-    if image := tribe.banner.get('image'):
-        embed.set_image(url=image)
+    if banner and banner.image:
+        embed.set_image(url=banner.image)
     
     leader = guild.get_member(tribe.leader)
     
@@ -52,33 +65,83 @@ def tribe_banner(tribe: Tribe, guild: Guild):
         value=leader or 'The leader is no longer part of the server... '
                         'ask the admins to appoint a new leader'
         )
-    members = [m for mid in tribe.members if (m:=guild.get_member(mid.member_id))]
+    present = presence_index.get(guild).present(tm.member_id for tm in members)
     embed.add_field(
         name='Members',
-        value=str(len(members) + (1 if leader else 0)) # if the leader is part of the guild count it, if not, just skip it
+        value=str(len(present) + (1 if leader else 0)) # if the leader is part of the guild count it, if not, just skip it
     )
     
     return embed
     
 
 class TribeMemberCollection:
-    def __init__(self, members: list[TribeMember]):
-        self.__members = members
+    """The members of a tribe, indexed by member id
+    Ids are packed in an array and a dict maps each id to its slot, so membership tests,
+    additions and removals are O(1) and large tribes don't keep a model instance per member.
+    """
+    __slots__ = ('tribe_id', 'guild_id', '_ids', '_slots')
+    
+    def __init__(self, members: Iterable[TribeMember], *, tribe_id: int | None = None, guild_id: int | None = None):
+        """
+        Args:
+            members (Iterable[TribeMember]): the members of the tribe
+            tribe_id (int | None): the pk of the tribe, taken from the members if not supplied
+            guild_id (int | None): the guild of the tribe, taken from the members if not supplied
+        """
+        self._ids = array('Q')
+        self._slots: dict[int, int] = {}
+        for member in members:
+            tribe_id = tribe_id or member.tribe_id
+            guild_id = guild_id or member.guild_id
+            self._append(member.member_id)
+        self.tribe_id = tribe_id
+        self.guild_id = guild_id
+    
+    @classmethod
+    async def load(cls, tribe: Tribe) -> 'TribeMemberCollection':
+        """Builds the collection of the tribe straight from the member ids, without instantiating models"""
+        collection = cls((), tribe_id=tribe.pk, guild_id=tribe.guild_config_id)
+        for member_id in await TribeMember.filter(tribe_id=tribe.pk).values_list('member_id', flat=True):
+            collection._append(member_id)
+        return collection
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __contains__(self, member_id: int) -> bool:
+        return member_id in self._slots
+    
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
     
     @property
-    def ids(self) -> list[int]:
-        """returns a list with the member ids"""
-        return [member.member_id for member in self.__members]
+    def ids(self) -> KeysView[int]:
+        """returns a live view of the member ids"""
+        return self._slots.keys()
+    
+    def _append(self, member_id: int):
+        if member_id not in self._slots:
+            self._slots[member_id] = len(self._ids)
+            self._ids.append(member_id)
+    
+    def discard(self, member_id: int):
+        """forgets the member if it is part of this collection, without touching the database"""
+        slot = self._slots.pop(member_id, None)
+        if slot is None:
+            return
+        last = self._ids.pop()
+        if last != member_id: # move the last id into the freed slot
+            self._ids[slot] = last
+            self._slots[last] = slot
+    
+    def _require_tribe(self) -> int:
+        if self.tribe_id is None:
+            raise ValueError('the collection is not bound to a tribe')
+        return self.tribe_id
 
     async def remove_member(self, member_id: int):
         """deletes a TribeMember that is part of this collection from the database"""
-        if not member_id in self.ids:
+        if member_id not in self._slots:
             raise ValueError(f'member with id "{member_id}" not a part of this collection')
-
-        index = self.ids.index(member_id)
-        member = self.__members.pop(index)
-        
-        await member.delete()
-        
-        
-        
\ No newline at end of file
+        await TribeMember.filter(tribe_id=self._require_tribe(), member_id=member_id).delete()
+        self.discard(member_id)
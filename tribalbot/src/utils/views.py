@@ -5,9 +5,18 @@ import discord
 from discord import ui, Interaction, Embed, Color, Member, Guild
 
 from tribalbot.src.orm.models import Tribe, TribeJoinApplication
-from tribalbot.src.controllers.tribes import accept_applicant
-from tribalbot.src.controllers.errors import InvalidMember, BadTribeCategory
+from tribalbot.src.orm.scope import open_scope
+from tribalbot.src.controllers.tribes import (
+    ApplicationReview,
+    accept_applicant,
+    accept_all_applications,
+    deny_all_applications,
+)
+from tribalbot.src.controllers.errors import AlreadyTribeMember, InvalidMember, BadTribeCategory
+from tribalbot.src.controllers.pagination import ApplicationPages, TribePages
+from tribalbot.src.constants import TRIBE_PAGE_LOOKAHEAD
 from tribalbot.src.utils.tribes import get_tribe_embed
+from tribalbot.src.utils.notifications import queue_dm
 
 
 class DisableButtonsMixin:
@@ -20,6 +29,7 @@ class DisableButtonsMixin:
 
 class BaseInteractionCheckMixin:
     async def interaction_check(self, itr: Interaction) -> bool:
+        open_scope() # every component interaction is dispatched in its own task
         owner = getattr(self, 'owner', None)
         if owner:
             if itr.user == owner:
@@ -88,51 +98,69 @@ class TribeBannerConfimationView(BaseInteractionCheckMixin, DisableButtonsMixin,
 class ApplicationPaginatorView(BaseInteractionCheckMixin, DisableButtonsMixin, ui.View):
     def __init__(
         self, 
-        applications: list[TribeJoinApplication], 
-        tribe: Tribe,
+        pages: ApplicationPages,
         owner: Member, 
         head=0, 
         timeout=120
     ):
         super().__init__(timeout=timeout)
         self.closed = False
-        self.applications = applications
-        self.tribe = tribe
+        self.pages = pages
+        self.tribe = pages.tribe
         self.owner = owner
         self.head = head
 
         self.invalid_applications = []
+        self._embeds: dict[int, Embed] = {} # application pk -> rendered embed
         
 
     @property
     def guild(self) -> Guild:
         return self.owner.guild
 
-    @property
-    def embeds(self) -> list[Embed]:
-        
-        default = [Embed(
+    @cached_property
+    def empty_embed(self) -> Embed:
+        return Embed(
             title='There are no applications',
             color=Color.random(),
-        )]
-        
-        embeds = []
-        for application in self.applications:
+        )
+
+    def application_embed(self, application: TribeJoinApplication) -> Embed:
+        """Returns the embed of the application, rendering it only the first time"""
+        embed = self._embeds.get(application.pk)
+        if embed is None:
             applicant = self.guild.get_member(application.applicant)
-            if applicant:
-                embed = Embed(
-                    title='Tribe Join Application',
-                    description=f'Tribe: {self.tribe.name}\n'
-                                f'Applicant: {applicant}\n'
-                                f'Application date: {application.pretty_dt}',
-                    color=Color.random()
-                )
-                embeds.append(embed)
-            else:
-                self.applications.remove(application)
-                self.invalid_applications.append(application)
+            embed = self._embeds[application.pk] = Embed(
+                title='Tribe Join Application',
+                description=f'Tribe: {self.tribe.name}\n'
+                            f'Applicant: {applicant}\n'
+                            f'Application date: {application.pretty_dt}',
+                color=Color.random()
+            )
+        return embed
+
+    def forget(self, application: TribeJoinApplication):
+        """Drops an application that was handled (or is invalid) from the menu"""
+        self.pages.remove(application)
+        self._embeds.pop(application.pk, None)
+
+    async def current(self) -> Optional[TribeJoinApplication]:
+        """Returns the application under the head, loading more applications if needed
+        Applications whose applicant is no longer part of the guild are skipped"""
+        while await self.pages.ensure(self.head):
+            application = self.pages.applications[self.head]
+            if self.guild.get_member(application.applicant):
+                return application
+            self.forget(application)
+            self.invalid_applications.append(application)
         
-        return embeds or default
+        if self.head and len(self.pages): # ran past the last application, wrap around
+            self.head = 0
+            return await self.current()
+
+    async def current_embed(self) -> Embed:
+        application = await self.current()
+        return self.application_embed(application) if application else self.empty_embed
 
     def accepted_embed(self, itr: Interaction):
         return Embed(
@@ -151,30 +179,42 @@ class ApplicationPaginatorView(BaseInteractionCheckMixin, DisableButtonsMixin, u
             )
     
     # TODO: auto disable and stop if there are no more applications
-        
-    @property
-    def index(self) -> int:
-        return self.head % len(self.embeds)
 
     @ui.button(custom_id="Back", emoji="◀️", row=0)
     async def _back(self, itr: discord.Interaction, button: ui.Button):
-        self.head -= 1
-        await itr.response.edit_message(embed=self.embeds[self.index], view=self)
+        if self.head:
+            self.head -= 1
+        elif self.pages.exhausted: # we can only wrap around once every application is loaded
+            self.head = len(self.pages) - 1
+        await itr.response.edit_message(embed=await self.current_embed(), view=self)
 
     @ui.button(custom_id="approve", emoji='✅', row=0)
     async def _approve(self, itr: Interaction, button: ui.Button):
-        application = self.applications[self.head]
+        application = await self.current()
+        if not application:
+            return await itr.response.edit_message(embed=self.empty_embed, view=self)
+        
         applicant = itr.guild.get_member(application.applicant)
-        msg = None
+        self.forget(application)
         
         try:
             await accept_applicant(applicant, application)
+        except AlreadyTribeMember as err: # approved twice, the application is gone
+            embed = Embed(
+                title='Invalid Application',
+                description=f'Member {applicant} could not be accepted: {err}',
+                color=Color.red()
+            )
+            return await itr.response.edit_message(embed=embed, view=self)
         except BadTribeCategory as err:
             self.invalid_applications.append(application)
-            msg = str(err)
+            embed = Embed(
+                title='Invalid Application',
+                description=f'Member {applicant} could not be accepted: {err}',
+                color=Color.red()
+            )
+            return await itr.response.edit_message(embed=embed, view=self)
             
-        msg = msg or f'Member {applicant} approved into the tribe!'
-        self.applications.remove(application)
         embed = Embed(
             title=f'Member Accepted',
             description=f'Member {applicant} was accepted into the tribe',
@@ -182,36 +222,66 @@ class ApplicationPaginatorView(BaseInteractionCheckMixin, DisableButtonsMixin, u
         )
         
         await itr.response.edit_message(embed=embed, view=self)
-        try:
-            await applicant.send(embed=self.accepted_embed(itr))
-        except: # user has disabled dms TODO: improve error handling
-            pass 
+        queue_dm(applicant, self.accepted_embed(itr))
     
     @ui.button(custom_id="deny", emoji='🚫', row=0)
     async def _deny(self, itr: Interaction, button: ui.Button):
-        application = self.applications[self.head]
+        application = await self.current()
+        if not application:
+            return await itr.response.edit_message(embed=self.empty_embed, view=self)
+        
         applicant = itr.guild.get_member(application.applicant)
+        self.forget(application)
         await application.delete()
-        self.applications.remove(application)
-        itr.channel.send()
         embed = Embed(
             title=f'Member Denied',
             description=f'Member {applicant if applicant else ""} application was denied',
             color=Color.red()
         )
         await itr.response.edit_message(embed=embed, view=self)
-        
-        try:
-            await applicant.send(embed=self.rejected_embed(itr))
-        except: # user has disabled dms TODO: improve error handling
-            pass 
+        queue_dm(applicant, self.rejected_embed(itr))
         
 
     @ui.button(custom_id="Next", emoji="▶️", row=0)
     async def _next(self, itr: discord.Interaction, button: ui.Button):
         self.head += 1
-        await itr.response.edit_message(embed=self.embeds[self.index], view=self)
+        await itr.response.edit_message(embed=await self.current_embed(), view=self)
     
+    def reload(self):
+        """Starts over from the first pending application, after a bulk review"""
+        self.pages = ApplicationPages(self.tribe, self.pages.page_size)
+        self._embeds.clear()
+        self.head = 0
+
+    async def send_review(self, itr: Interaction, review: ApplicationReview, accepted: bool):
+        """Shows the outcome of a bulk review and queues the applicants' notifications"""
+        notification = self.accepted_embed(itr) if accepted else self.rejected_embed(itr)
+        for applicant_id in review.applicants:
+            queue_dm(itr.guild.get_member(applicant_id), notification)
+        
+        description = f'{len(review.applicants)} applications were {"approved" if accepted else "denied"}'
+        if review.skipped:
+            description += f'\n{len(review.skipped)} were left pending (category conflicts or members that left the server)'
+        if review.members:
+            description += f'\n{len(review.members)} were already members of the tribe, their applications were removed'
+        embed = Embed(
+            title='Applications Reviewed',
+            description=description,
+            color=Color.green() if accepted else Color.red()
+        )
+        self.reload()
+        await itr.response.edit_message(embed=embed, view=self)
+
+    @ui.button(custom_id="approve_all", label='Approve all valid', style=discord.ButtonStyle.green, row=1)
+    async def _approve_all(self, itr: Interaction, button: ui.Button):
+        review = await accept_all_applications(self.tribe, itr.guild)
+        await self.send_review(itr, review, accepted=True)
+
+    @ui.button(custom_id="deny_all", label='Deny all', style=discord.ButtonStyle.red, row=1)
+    async def _deny_all(self, itr: Interaction, button: ui.Button):
+        review = await deny_all_applications(self.tribe)
+        await self.send_review(itr, review, accepted=False)
+
     @ui.button(custom_id="Close", emoji="❌", row=1)
     async def _close(self, itr: discord.Interaction, _):
         self.closed = True
@@ -227,37 +297,62 @@ class TribePaginatorView(
     def __init__(
         self, *, 
         owner: Member, 
-        tribes: list[Tribe],
+        pages: TribePages,
         head=0, 
         timeout: Optional[float] = 180
     ):
         super().__init__(timeout=timeout)
         self.owner = owner
-        self.tribes = tribes
+        self.pages = pages
         self.head = head
-    
-    @cached_property
-    def embeds(self) -> list[Embed]:
-        guild = self.owner.guild
-        return [
-            get_tribe_embed(tribe, guild)
-            for tribe in self.tribes
-        ]
+        self._embeds: dict[int, Embed] = {} # only the tribes around the head are kept rendered
     
     @property
     def index(self) -> int:
-        return self.head % len(self.embeds)
+        return self.head % len(self.pages)
+
+    def render(self, tribe: Optional[Tribe]) -> Embed:
+        if tribe is None: # deleted after the menu was opened
+            return Embed(title='This tribe no longer exists', color=Color.red())
+        return get_tribe_embed(tribe, self.owner.guild)
+
+    async def current_embed(self) -> Embed:
+        """Returns the embed of the tribe under the head, rendering it if needed
+        and preparing the next and previous tribes in the background"""
+        index = self.index
+        embed = self._embeds.get(index)
+        if embed is None:
+            embed = self._embeds[index] = self.render(await self.pages.get(index))
+        self.look_ahead()
+        return embed
+
+    def look_ahead(self):
+        total = len(self.pages)
+        window = {
+            (self.head + step) % total
+            for step in range(-TRIBE_PAGE_LOOKAHEAD, TRIBE_PAGE_LOOKAHEAD + 1)
+        }
+        for index in list(self._embeds):
+            if index not in window:
+                del self._embeds[index]
+        for index in window:
+            if index in self._embeds:
+                continue
+            if tribe := self.pages.loaded(index):
+                self._embeds[index] = self.render(tribe)
+            else:
+                self.pages.prefetch(index)
 
     @ui.button(custom_id="Back", emoji="◀️", row=0)
     async def _back(self, itr: discord.Interaction, button: ui.Button):
         self.head -= 1
-        await itr.response.edit_message(embed=self.embeds[self.index], view=self)
+        await itr.response.edit_message(embed=await self.current_embed(), view=self)
     
     
     @ui.button(custom_id="Next", emoji="▶️", row=0)
     async def _next(self, itr: discord.Interaction, button: ui.Button):
         self.head += 1
-        await itr.response.edit_message(embed=self.embeds[self.index], view=self)
+        await itr.response.edit_message(embed=await self.current_embed(), view=self)
     
     @ui.button(custom_id="Close", emoji="❌", row=1)
     async def _close(self, itr: discord.Interaction, _):
@@ -266,19 +361,15 @@ class TribePaginatorView(
         self.stop()
     
     @classmethod
-    async def send_menu(cls, interaction: Interaction, tribes: list[Tribe]):
-        if len(tribes) > 1:
-            view = cls(owner=interaction.user, tribes=tribes)
-            await interaction.response.send_message(embed=view.embeds[0], view=view)
-        elif len(tribes) == 1:
-            await interaction.response.send_message(embed=get_tribe_embed(tribes.pop(), interaction.guild))
+    async def send_menu(cls, interaction: Interaction, pages: TribePages):
+        if len(pages) > 1:
+            view = cls(owner=interaction.user, pages=pages)
+            await interaction.response.send_message(embed=await view.current_embed(), view=view)
+        elif len(pages) == 1:
+            tribe = await pages.get(0)
+            if tribe:
+                await interaction.response.send_message(embed=get_tribe_embed(tribe, interaction.guild))
+            else:
+                await interaction.response.send_message('No tribes to show!', ephemeral=True)
         else:
             await interaction.response.send_message('No tribes to show!', ephemeral=True)
-            
-        
-    
-    
-
-    
-
-        
\ No newline at end of file